@@ -0,0 +1,52 @@
+"""Measure the memory cost of Book instances as loaded from a library file.
+
+Usage: python benchmarks/book_memory.py [count]
+"""
+import os
+import sys
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from models.book import Book
+
+STATUSES = ["To Be Read", "Finished", "Currently Reading"]
+GENRES = ["Fantasy", "Horror", "Comic", "Romance", "Mystery", "Sci-Fi", "Biography", "Funny", "Suspense"]
+
+def make_records(count: int, seed: int = 42) -> list:
+    """Book dicts shaped like the _extended.json records, each with its own string objects"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        finished = rng.random() < 0.5
+        records.append({
+            'title': f"Book {i}",
+            'author': f"Author {i % 500}",
+            'genre': ' - '.join(rng.sample(GENRES, rng.randint(1, 3))),
+            'status': ''.join(rng.choice(STATUSES)),
+            'rating': rng.randint(0, 5),
+            'review': '',
+            'total_pages': rng.randint(100, 900),
+            'pages_read': 0,
+            'date_started': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if finished else "",
+            'date_finished': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if finished else "",
+            'reading_time_minutes': rng.randint(0, 3000),
+            'isbn': '',
+            'cover_url': ''
+        })
+    return records
+
+def measure(count: int) -> float:
+    records = make_records(count)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    books = [Book.from_dict(record) for record in records]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del books
+    return allocated / count
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{count} books: {measure(count):.0f} bytes per book")
@@ -0,0 +1,291 @@
+"""Check the book API resilience layer against a local fake server that injects latency and errors.
+
+Usage: python benchmarks/fake_provider.py [--only retries,circuit_opens] [--verbose]
+
+The server stands in for both Open Library and Google Books. Each scenario
+scripts its replies (status codes, Retry-After headers, delays, broken bodies)
+and drives AsyncBookAPI through fresh Provider instances, then checks the
+retries, circuit breaker transitions, hedging and Google Books fallback that
+resulted. BookAPI goes through the same Provider class. Exits with 1 if any
+check fails.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from utils.async_book_api import AsyncBookAPI
+from utils.resilience import Provider, CircuitBreaker
+
+# ISBN -> (title, author) the fake providers know about
+CATALOG = {f"97800000000{i:02d}": (f"Fake Book {i}", f"Fake Author {i}") for i in range(20)}
+
+class Reply(NamedTuple):
+    status: int = 200
+    delay: float = 0.0
+    retry_after: Optional[str] = None
+    # Send this instead of the catalog answer (e.g. a body that isn't JSON)
+    body: Optional[bytes] = None
+
+class FakeServer:
+    """HTTP server on 127.0.0.1 serving /ol (Open Library) and /gb (Google Books) from a script.
+
+    script(route, *replies) queues one reply per request; once the queue is
+    empty the route's default reply is used. Every request is counted per route.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues: Dict[str, deque] = {}
+        self.defaults: Dict[str, Reply] = {}
+        self.hits: Dict[str, int] = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def reset(self):
+        with self.lock:
+            self.queues.clear()
+            self.defaults.clear()
+            self.hits.clear()
+
+    def script(self, route: str, *replies: Reply, default: Reply = Reply()):
+        with self.lock:
+            self.queues[route] = deque(replies)
+            self.defaults[route] = default
+
+    def hit_count(self, route: str) -> int:
+        with self.lock:
+            return self.hits.get(route, 0)
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        url = urlsplit(request.path)
+        route = url.path.split('/')[1]
+        with self.lock:
+            self.hits[route] = self.hits.get(route, 0) + 1
+            queue = self.queues.get(route)
+            reply = queue.popleft() if queue else self.defaults.get(route, Reply())
+        if reply.delay:
+            time.sleep(reply.delay)
+
+        body = reply.body
+        if body is None and reply.status == 200:
+            body = json.dumps(self.answer(route, parse_qs(url.query))).encode('utf-8')
+        try:
+            request.send_response(reply.status)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(body or b'')))
+            if reply.retry_after is not None:
+                request.send_header('Retry-After', reply.retry_after)
+            request.end_headers()
+            request.wfile.write(body or b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting (a timeout scenario)
+            pass
+
+    @staticmethod
+    def answer(route: str, query: Dict[str, List[str]]) -> Dict:
+        if route == 'ol':
+            isbns = [key[5:] for key in query.get('bibkeys', [''])[0].split(',')]
+            return {f"ISBN:{isbn}": {'title': CATALOG[isbn][0], 'authors': [{'name': CATALOG[isbn][1]}]}
+                    for isbn in isbns if isbn in CATALOG}
+        isbn = query.get('q', [''])[0].replace('isbn:', '')
+        if isbn not in CATALOG:
+            return {'totalItems': 0}
+        title, author = CATALOG[isbn]
+        return {'totalItems': 1, 'items': [{'volumeInfo': {'title': title, 'authors': [author]}}]}
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def make_client(server: FakeServer, failure_threshold: int = 5, max_attempts: int = 3,
+                reset_timeout: float = 0.3, hedge_delay: float = 5.0, timeout: float = 2.0):
+    """AsyncBookAPI on the fake server with its own fast-retrying providers"""
+    providers = {name: Provider(name, rate=1000, burst=1000, max_attempts=max_attempts, base_delay=0.01,
+                                max_delay=0.05, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+                 for name in ('openlibrary', 'googlebooks')}
+    client = AsyncBookAPI(f"{server.url}/ol", f"{server.url}/gb", batch_size=10, hedge_delay=hedge_delay,
+                          timeout=timeout, providers=providers)
+    return client, providers['openlibrary'], providers['googlebooks']
+
+def titles(results: Dict[str, Optional[Dict]]) -> Dict[str, Optional[str]]:
+    return {isbn: result['title'] if result else None for isbn, result in results.items()}
+
+def expect(checks: List[str], condition: bool, message: str):
+    if not condition:
+        checks.append(message)
+
+ISBNS = list(CATALOG)[:5]
+EXPECTED = {isbn: CATALOG[isbn][0] for isbn in ISBNS}
+
+def scenario_batching(server: FakeServer, checks: List[str]):
+    server.script('ol')
+    client, _, _ = make_client(server)
+    results = client.lookup_many_sync(ISBNS)
+    expect(checks, titles(results) == EXPECTED, f"wrong results {titles(results)}")
+    expect(checks, server.hit_count('ol') == 1, f"{server.hit_count('ol')} Open Library requests for one batch")
+    expect(checks, server.hit_count('gb') == 0, "Google Books asked although Open Library had every ISBN")
+
+def scenario_retries(server: FakeServer, checks: List[str]):
+    server.script('ol', Reply(503), Reply(502))
+    client, open_library, _ = make_client(server)
+    results = client.lookup_many_sync(ISBNS)
+    stats = open_library.stats()
+    expect(checks, titles(results) == EXPECTED, f"wrong results {titles(results)}")
+    expect(checks, stats['retries'] == 2 and stats['successes'] == 1, f"provider stats {stats}")
+    expect(checks, stats['circuit'] == CircuitBreaker.CLOSED, f"circuit {stats['circuit']} after recovering")
+
+def scenario_retry_after(server: FakeServer, checks: List[str]):
+    server.script('ol', Reply(429, retry_after="0.15"))
+    client, open_library, _ = make_client(server)
+    start = time.perf_counter()
+    results = client.lookup_many_sync(ISBNS)
+    elapsed = time.perf_counter() - start
+    expect(checks, titles(results) == EXPECTED, f"wrong results {titles(results)}")
+    expect(checks, elapsed >= 0.15, f"retried after {elapsed:.2f}s despite Retry-After: 0.15")
+
+def scenario_timeout(server: FakeServer, checks: List[str]):
+    server.script('ol', Reply(delay=0.6))
+    client, open_library, _ = make_client(server, timeout=0.2)
+    results = client.lookup_many_sync(ISBNS)
+    stats = open_library.stats()
+    expect(checks, titles(results) == EXPECTED, f"wrong results {titles(results)}")
+    expect(checks, stats['retries'] >= 1, f"a timed-out request was not retried: {stats}")
+
+def scenario_hedging(server: FakeServer, checks: List[str]):
+    server.script('ol', default=Reply(delay=1.0))
+    client, _, _ = make_client(server, hedge_delay=0.2)
+    start = time.perf_counter()
+    results = client.lookup_many_sync(ISBNS)
+    elapsed = time.perf_counter() - start
+    expect(checks, titles(results) == EXPECTED, f"wrong results {titles(results)}")
+    expect(checks, server.hit_count('gb') == len(ISBNS), f"{server.hit_count('gb')} hedged Google Books requests")
+    expect(checks, elapsed < 1.0, f"hedged lookup still waited {elapsed:.2f}s for the slow provider")
+
+def scenario_fallback(server: FakeServer, checks: List[str]):
+    server.script('ol', default=Reply(503))
+    client, open_library, _ = make_client(server, max_attempts=2)
+    results = client.lookup_many_sync(ISBNS)
+    expect(checks, titles(results) == EXPECTED, f"Google Books fallback gave {titles(results)}")
+    expect(checks, open_library.stats()['failures'] == 2, f"Open Library stats {open_library.stats()}")
+
+def scenario_circuit_opens(server: FakeServer, checks: List[str]):
+    server.script('ol', default=Reply(503))
+    client, open_library, _ = make_client(server, failure_threshold=3, max_attempts=1, reset_timeout=60)
+    for isbn in list(CATALOG)[:6]:
+        result = client.lookup_isbn_sync(isbn)
+        expect(checks, result and result['title'] == CATALOG[isbn][0], f"no fallback result for {isbn}")
+    stats = open_library.stats()
+    expect(checks, server.hit_count('ol') == 3, f"{server.hit_count('ol')} requests reached a provider that was down")
+    expect(checks, stats['circuit'] == CircuitBreaker.OPEN and stats['circuit_opens'] == 1, f"stats {stats}")
+    expect(checks, stats['short_circuits'] == 3, f"{stats['short_circuits']} calls failed fast, expected 3")
+
+def open_circuit(server: FakeServer, open_library: Provider, client: AsyncBookAPI):
+    """Fail Open Library until its breaker opens, then wait out the reset timeout"""
+    server.script('ol', default=Reply(503))
+    while open_library.breaker.state != CircuitBreaker.OPEN:
+        client.lookup_isbn_sync(ISBNS[0])
+    time.sleep(open_library.breaker.reset_timeout)
+
+def scenario_half_open(server: FakeServer, checks: List[str]):
+    client, open_library, _ = make_client(server, failure_threshold=2, max_attempts=1)
+    open_circuit(server, open_library, client)
+    # A failed trial opens it again right away
+    server.script('ol', Reply(503))
+    client.lookup_isbn_sync(ISBNS[0])
+    expect(checks, open_library.breaker.state == CircuitBreaker.OPEN,
+           f"circuit {open_library.breaker.state} after a failed trial")
+    # A successful one closes it
+    time.sleep(open_library.breaker.reset_timeout)
+    hits = server.hit_count('ol')
+    result = client.lookup_isbn_sync(ISBNS[1])
+    expect(checks, result and result['title'] == CATALOG[ISBNS[1]][0], f"wrong result {result}")
+    expect(checks, server.hit_count('ol') == hits + 1, "no trial request after the reset timeout")
+    expect(checks, open_library.breaker.state == CircuitBreaker.CLOSED,
+           f"circuit {open_library.breaker.state} after a successful trial")
+
+def scenario_non_transient(server: FakeServer, checks: List[str]):
+    client, open_library, _ = make_client(server, failure_threshold=2, max_attempts=1)
+    open_circuit(server, open_library, client)
+    # A 200 that isn't JSON is a bad answer, not proof the provider is healthy again
+    server.script('ol', Reply(200, body=b"<html>maintenance</html>"))
+    client.lookup_isbn_sync(ISBNS[0])
+    expect(checks, open_library.breaker.state == CircuitBreaker.HALF_OPEN,
+           f"circuit {open_library.breaker.state} after a non-transient error on the trial call")
+    # The trial slot was freed, so the next call is the trial
+    hits = server.hit_count('ol')
+    client.lookup_isbn_sync(ISBNS[1])
+    expect(checks, server.hit_count('ol') == hits + 1, "the next call was not let through as the trial")
+    expect(checks, open_library.breaker.state == CircuitBreaker.CLOSED,
+           f"circuit {open_library.breaker.state} after a successful trial")
+
+SCENARIOS: Dict[str, Callable[[FakeServer, List[str]], None]] = {
+    'batching': scenario_batching,
+    'retries': scenario_retries,
+    'retry_after': scenario_retry_after,
+    'timeout': scenario_timeout,
+    'hedging': scenario_hedging,
+    'fallback': scenario_fallback,
+    'circuit_opens': scenario_circuit_opens,
+    'half_open': scenario_half_open,
+    'non_transient': scenario_non_transient,
+}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma-separated scenario names to run")
+    parser.add_argument("--verbose", action="store_true", help="keep the clients' own error output")
+    args = parser.parse_args()
+    only = args.only.split(',') if args.only else None
+
+    server = FakeServer()
+    failed = 0
+    try:
+        for name, scenario in SCENARIOS.items():
+            if only and name not in only:
+                continue
+            server.reset()
+            checks: List[str] = []
+            start = time.perf_counter()
+            # The clients print every upstream error they recover from; that is the point here
+            stdout = sys.stdout
+            if not args.verbose:
+                sys.stdout = open(os.devnull, 'w')
+            try:
+                scenario(server, checks)
+            except Exception as e:
+                checks.append(f"raised {type(e).__name__}: {e}")
+            finally:
+                if not args.verbose:
+                    sys.stdout.close()
+                    sys.stdout = stdout
+            status = "ok" if not checks else "FAILED"
+            print(f"{name:<16} {status:<7} {(time.perf_counter() - start) * 1000:8.0f} ms")
+            for message in checks:
+                print(f"    {message}")
+            failed += bool(checks)
+    finally:
+        server.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
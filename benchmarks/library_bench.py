@@ -0,0 +1,190 @@
+"""Time the library's load, save, search, filter/sort, statistics and export paths on synthetic libraries.
+
+Usage: python benchmarks/library_bench.py [--sizes 1000,10000,100000,1000000] [--repeat 5]
+                                          [--only load,search] [--output results.json]
+                                          [--compare baseline.json] [--threshold 1.2]
+
+Results are written as JSON (one entry per size and benchmark, with every run's
+time in seconds) so two commits can be compared with --compare.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+from models.library import Library
+from models.library_manager import LibraryManager
+from models.query_cache import SORT_OPTIONS
+from utils.export_utils import export_to_csv, export_to_json
+from synthetic import SyntheticLibrary
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+SEARCHES = ("fantasy", "author 12", "twist", "book 99", "no such book")
+# (search, status, rating) as the status/rating dropdowns and search field produce them;
+# with every sort option that is 30 views, which fits in the query cache
+VIEWS = (("", None, None), ("", "Finished", None), ("", None, 5), ("", "To Be Read", 0),
+         ("author 1", "Finished", None))
+
+def time_runs(run: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+def query_all(library: Library):
+    """Every filter combination under every sort order, like clicking through refresh_book_list"""
+    for sort_by in SORT_OPTIONS:
+        for search, status, rating in VIEWS:
+            library.query_books(search, status, rating, sort_by)
+
+def benchmarks_for(csv_file: str, base_path: str, work_dir: str) -> Dict[str, tuple]:
+    """name -> (run, setup) for one generated library; `library` is built lazily and shared"""
+    state = {}
+
+    def library() -> Library:
+        if 'library' not in state:
+            state['library'] = Library("Benchmark Library", csv_file)
+        return state['library']
+
+    def ensure_binary():
+        if not os.path.exists(csv_file.replace('.csv', '.rwb')):
+            library().save_books_to_binary()
+
+    def search():
+        for query in SEARCHES:
+            library().search_books(query)
+
+    def search_scan():
+        # The linear scan search_books did before it had an index, as the reference for search_first
+        for query in SEARCHES:
+            query = query.lower()
+            [book for book in library().books
+             if query in book.title.lower() or query in book.author.lower()
+             or any(query in genre.lower() for genre in book.genre) or query in book.review.lower()]
+
+    return {
+        'load': (lambda: Library("Benchmark Library", csv_file), None),
+        'manager_startup': (lambda: LibraryManager(base_path).get_current_library(), None),
+        'load_binary': (lambda: Library("Benchmark Library", csv_file, storage="binary"), ensure_binary),
+        'load_mapped': (lambda: Library("Benchmark Library", csv_file, storage="mapped"), ensure_binary),
+        'save_json': (lambda: library().save_books_to_json(), None),
+        'save_binary': (lambda: library().save_books_to_binary(), None),
+        'save_csv': (lambda: library().save_books_to_csv(), None),
+        'search_scan': (search_scan, None),
+        'search_first': (search, lambda: library().search_index.reset(library().books)),
+        'search': (search, lambda: library().search_index.ensure_built()),
+        'filter_sort_cold': (lambda: query_all(library()), lambda: library().query_cache.clear()),
+        'filter_sort_warm': (lambda: query_all(library()), None),
+        'statistics': (lambda: library().get_reading_statistics(), None),
+        'statistics_rebuild': (lambda: library().get_statistics().rebuild(library().books), None),
+        'export_json': (lambda: export_to_json(library(), os.path.join(work_dir, "export.json")), None),
+        'export_csv': (lambda: export_to_csv(library().books, os.path.join(work_dir, "export.csv")), None),
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes: List[int], repeat: int, only: Optional[List[str]], seed: int) -> Dict:
+    generator = SyntheticLibrary(seed)
+    results = []
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix=f"readwise-bench-{size}-")
+        try:
+            base_path = os.path.join(work_dir, "data")
+            csv_file = generator.write_library(size, base_path)
+            for name, (run, setup) in benchmarks_for(csv_file, base_path, work_dir).items():
+                if only and name not in only:
+                    continue
+                times = time_runs(run, repeat, setup)
+                results.append({'size': size, 'benchmark': name, 'times': times,
+                                'min': min(times), 'median': statistics.median(times)})
+                print(f"{size:>9,} {name:<20} median {statistics.median(times) * 1000:10.2f} ms"
+                      f"   min {min(times) * 1000:10.2f} ms", file=sys.stderr)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> int:
+    """Print median ratios against a baseline run; returns how many got slower than `threshold`"""
+    previous = {(entry['size'], entry['benchmark']): entry['median'] for entry in baseline['results']}
+    regressions = 0
+    print(f"Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('date', '?')})", file=sys.stderr)
+    for entry in current['results']:
+        before = previous.get((entry['size'], entry['benchmark']))
+        if not before:
+            continue
+        ratio = entry['median'] / before
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{entry['size']:>9,} {entry['benchmark']:<20} {before * 1000:10.2f} ms -> "
+              f"{entry['median'] * 1000:10.2f} ms  x{ratio:.2f}{flag}", file=sys.stderr)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated library sizes (default %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="where to write the JSON results (default: stdout)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median ratio above which --compare reports a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    only = args.only.split(',') if args.only else None
+    report = run_suite(sizes, args.repeat, only, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Synthetic libraries for the benchmarks, shaped like real _extended.json snapshots.
+
+Usage: python benchmarks/synthetic.py COUNT OUTPUT_DIR [--seed N]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import date, timedelta
+from typing import Dict, List, Sequence
+
+STATUSES = ("Finished", "To Be Read", "Currently Reading")
+STATUS_WEIGHTS = (0.55, 0.35, 0.10)
+GENRES = ("Fantasy", "Horror", "Comic", "Romance", "Mystery", "Sci-Fi", "Biography", "Funny",
+          "Suspense", "Feel good", "Thriller", "History", "Poetry", "Young Adult", "Classic",
+          "Adventure", "Drama", "Self-help", "Science", "Travel")
+WORDS = ("the", "a", "story", "character", "plot", "ending", "loved", "slow", "twist", "world",
+         "writing", "pages", "great", "boring", "beautiful", "dark", "funny", "series", "again", "read")
+
+class SyntheticLibrary:
+    """Deterministic generator of book records (the dicts Book.from_dict reads).
+
+    genre_skew is the Zipf exponent of genre popularity (0 = uniform);
+    review_rate is the share of books with a review and review_words its mean length.
+    """
+
+    def __init__(self, seed: int = 42, authors: int = 2000, genre_skew: float = 1.0,
+                 review_rate: float = 0.3, review_words: int = 60, genres: Sequence[str] = GENRES):
+        self.seed = seed
+        self.authors = authors
+        self.genres = list(genres)
+        self.genre_weights = [1 / (rank + 1) ** genre_skew for rank in range(len(self.genres))]
+        self.review_rate = review_rate
+        self.review_words = review_words
+
+    def review(self, rng: random.Random) -> str:
+        if rng.random() >= self.review_rate:
+            return ""
+        length = max(1, int(rng.expovariate(1 / self.review_words)))
+        return ' '.join(rng.choices(WORDS, k=length)).capitalize() + "."
+
+    def record(self, rng: random.Random, i: int) -> Dict:
+        status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        total_pages = rng.randint(80, 1200)
+        started = finished = ""
+        pages_read = 0
+        if status != "To Be Read":
+            start = date(2015, 1, 1) + timedelta(days=rng.randint(0, 3650))
+            started = start.isoformat()
+            pages_read = total_pages if status == "Finished" else rng.randint(0, total_pages)
+            if status == "Finished":
+                finished = (start + timedelta(days=rng.randint(1, 120))).isoformat()
+        genres = set()
+        for _ in range(rng.randint(1, 3)):
+            genres.add(rng.choices(self.genres, self.genre_weights)[0])
+        return {
+            'title': f"Book {i} {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            'author': f"Author {rng.randrange(self.authors)}",
+            'genre': ' - '.join(sorted(genres)),
+            'status': status,
+            'rating': rng.randint(1, 5) if status == "Finished" and rng.random() < 0.8 else 0,
+            'review': self.review(rng),
+            'total_pages': total_pages,
+            'pages_read': pages_read,
+            'date_started': started,
+            'date_finished': finished,
+            'reading_time_minutes': pages_read * rng.randint(1, 3),
+            'isbn': f"978{rng.randrange(10 ** 10):010d}" if rng.random() < 0.7 else "",
+            'cover_url': ""
+        }
+
+    def records(self, count: int) -> List[Dict]:
+        rng = random.Random(f"{self.seed}:{count}")
+        return [self.record(rng, i) for i in range(count)]
+
+    def write_library(self, count: int, base_path: str, library_id: str = "main") -> str:
+        """Write a one-library data directory (config + JSON snapshot); returns the library's CSV path"""
+        os.makedirs(base_path, exist_ok=True)
+        config = {
+            "libraries": [{"id": library_id, "name": "Benchmark Library", "created_date": "2025-01-01T00:00:00",
+                           "color": "#2196F3", "icon": "library_books"}],
+            "current_library": library_id,
+            "max_libraries": 5
+        }
+        with open(os.path.join(base_path, "libraries_config.json"), 'w', encoding='utf-8') as file:
+            json.dump(config, file, indent=2)
+        csv_file = os.path.join(base_path, f"books_{library_id}.csv")
+        data = {'library_name': "Benchmark Library", 'last_updated': "2025-01-01T00:00:00",
+                'books': self.records(count)}
+        with open(csv_file.replace('.csv', '_extended.json'), 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2, ensure_ascii=False)
+        return csv_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic library data directory")
+    parser.add_argument("count", type=int)
+    parser.add_argument("output_dir")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    path = SyntheticLibrary(args.seed).write_library(args.count, args.output_dir)
+    print(f"Wrote {args.count} books for {path}", file=sys.stderr)
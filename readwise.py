@@ -2,6 +2,7 @@ import flet as ft
 import os
 import sys
 import json
+import threading
 from datetime import datetime
 from typing import Optional
 
@@ -10,17 +11,61 @@ sys.path.append('src')
 from models.book import Book
 from models.library import Library
 from models.library_manager import LibraryManager
-from utils.book_api import BookAPI
+from models.sqlite_store import StoreWriteError
+from models.startup_snapshot import StartupSnapshot
+from utils.cover_cache import CoverCache
+from utils.search_scheduler import SearchScheduler
+from utils.resilience import provider_stats
+from utils.instrumentation import INSTRUMENTATION, timed
+
+# Book cards materialized per scroll step; more are added as the list nears its end
+BOOK_LIST_PAGE_SIZE = 40
+# How close (in pixels) to the bottom of the list before the next page is rendered
+BOOK_LIST_PREFETCH_PIXELS = 800
+# The list every launch opens on: no search, all statuses and ratings, sorted by status
+STARTUP_VIEW = ("", None, None, "Status")
 
 class ReadWiseApp:
     def __init__(self):
         self.data_path = "/Users/juanmateo/Desktop/Library app/ReadWise/src/data"
+        # Timings for the diagnostics panel are opt-in (also on with READWISE_INSTRUMENT=1)
+        settings = self.load_settings()
+        INSTRUMENTATION.enabled = INSTRUMENTATION.enabled or settings.get("instrumentation", False)
+        INSTRUMENTATION.slow_threshold_ms = settings.get("slow_operation_ms", INSTRUMENTATION.slow_threshold_ms)
         self.library_manager = LibraryManager(self.data_path)
         self.selected_book: Optional[Book] = None
         self.current_view = "library"
         self.select_mode = False
         self.selected_books = set()
         
+        # Book list rendering state: the full filtered result, how much of it is
+        # materialized, and a card cache keyed by book identity
+        self.visible_books = []
+        self.rendered_count = 0
+        self.card_cache = {}
+        
+        # Search input is debounced; the last result set is reused when a query is extended
+        self.search_scheduler = SearchScheduler(self.run_search)
+        
+        # ISBN lookups share pooled connections to Open Library and Google Books, and are
+        # cached on disk; in offline mode they are answered from that cache only. Both are
+        # created on first use so their imports and the cache database stay off the startup path
+        self.offline_mode = settings.get("offline_mode", False)
+        self.api_cache = None
+        self.book_client = None
+        self.client_lock = threading.Lock()
+        self.enrichment_job = None
+        self.enrichment_progress = None
+        
+        # Covers are downloaded once into a local cache; cards show small thumbnails from it
+        self.cover_cache = CoverCache(os.path.join(self.data_path, "covers"))
+        
+        # The first page of the list from the last session, shown while the library loads
+        self.startup_snapshot = StartupSnapshot(os.path.join(self.data_path, "startup_snapshot.pickle"))
+        self.library_ready = False
+        # Copies unpickled from the snapshot, not the library's books; their cards are read-only
+        self.startup_books = []
+        
         # Theme system
         self.themes = {
             "light": {
@@ -52,35 +97,35 @@ class ReadWiseApp:
         }
         self.current_theme = self.load_theme_preference()
         
-    def load_theme_preference(self):
-        """Load saved theme preference"""
+    def load_settings(self):
+        """Load app settings (theme, offline mode)"""
         settings_file = os.path.join(self.data_path, "settings.json")
         try:
             if os.path.exists(settings_file):
                 with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    return settings.get("theme", "light")
+                    return json.load(f)
         except:
             pass
-        return "light"
+        return {}
     
-    def save_theme_preference(self, theme_id):
-        """Save theme preference to settings"""
+    def save_setting(self, key, value):
+        """Save a single app setting"""
         settings_file = os.path.join(self.data_path, "settings.json")
-        settings = {}
-        try:
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-        except:
-            pass
-        
-        settings["theme"] = theme_id
+        settings = self.load_settings()
+        settings[key] = value
         try:
             with open(settings_file, 'w') as f:
                 json.dump(settings, f, indent=2)
         except Exception as e:
-            print(f"Error saving theme: {e}")
+            print(f"Error saving {key}: {e}")
+    
+    def load_theme_preference(self):
+        """Load saved theme preference"""
+        return self.load_settings().get("theme", "light")
+    
+    def save_theme_preference(self, theme_id):
+        """Save theme preference to settings"""
+        self.save_setting("theme", theme_id)
     
     def get_theme_colors(self):
         """Get current theme colors"""
@@ -210,6 +255,10 @@ class ReadWiseApp:
         # Apply initial theme
         self.apply_theme(page)
         
+        # Write any queued library changes before the session goes away
+        page.on_disconnect = self.on_app_close
+        page.on_close = self.on_app_close
+        
         # Main layout
         page.add(
             ft.Column([
@@ -225,14 +274,74 @@ class ReadWiseApp:
         # Update dropdown options with actual data
         self.update_library_dropdown_options()
         
-        # Show library view initially  
+        # Show library view initially, from the startup snapshot until the library is loaded
         self.current_view = "library"
-        self.show_library_view()
+        self.show_library_view_without_refresh()
+        snapshot_shown = self.show_startup_snapshot()
         page.update()
         
+        # Parse the library off the UI thread; the real list replaces the snapshot when it is done
+        threading.Thread(target=self.finish_startup, args=(snapshot_shown,), daemon=True).start()
+    
+    def show_startup_snapshot(self):
+        """Fill the list from the startup snapshot, or show a loading note; returns True if it was valid"""
+        library_id = self.library_manager.current_library_id
+        books = self.startup_snapshot.load(library_id, self.library_manager.library_signature(library_id),
+                                           STARTUP_VIEW)
+        if books is None:
+            self.book_list.controls = [
+                ft.Container(
+                    content=ft.Column([
+                        ft.ProgressRing(),
+                        ft.Text("Loading your library...", size=18, color=ft.Colors.GREY_600),
+                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                    padding=40,
+                    alignment=ft.alignment.center,
+                )
+            ]
+            return False
+        self.startup_books = books
+        self.visible_books = books
+        self.rendered_count = len(books)
+        self.render_book_window()
+        return True
+    
+    def is_startup_book(self, book):
+        """Whether a book is a startup snapshot copy; editing it would change nothing in the library"""
+        return any(book is startup_book for startup_book in self.startup_books)
+    
+    def finish_startup(self, snapshot_shown):
+        """Load the current library in the background, then swap the real list in"""
+        try:
+            self.library_manager.get_current_library()
+        except Exception as ex:
+            print(f"⚠️ Error loading library: {ex}")
+        self.library_ready = True
+        if not snapshot_shown and not self.library_manager.persistence.has_pending():
+            self.save_startup_snapshot()
+        try:
+            if self.current_view == "library":
+                self.refresh_book_list()
+        except Exception as ex:
+            print(f"Error showing library: {ex}")
+    
+    def save_startup_snapshot(self):
+        """Remember the first page of the current library for the next launch (call once saves are written)"""
+        library_id = self.library_manager.current_library_id
+        library = self.library_manager.libraries.get(library_id)
+        if not library:
+            return
+        books = library.query_books(*STARTUP_VIEW)[:BOOK_LIST_PAGE_SIZE]
+        self.startup_snapshot.save(library_id, self.library_manager.library_signature(library_id),
+                                   STARTUP_VIEW, books)
+        
     def create_components(self, page):
         # Book list
-        self.book_list = ft.ListView(expand=1, spacing=10, padding=20)
+        self.book_list = ft.ListView(
+            expand=1, spacing=10, padding=20,
+            on_scroll=self.on_book_list_scroll,
+            on_scroll_interval=100,
+        )
         
         # Search and filters
         # These will be themed in show_library_view_without_refresh
@@ -318,7 +427,8 @@ class ReadWiseApp:
     
     def update_library_dropdown_options(self):
         """Update the library dropdown with current libraries + DNF"""
-        libraries = self.library_manager.get_library_list()
+        # Only names are shown, so no library needs to be loaded for this
+        libraries = self.library_manager.get_library_configs()
         options = []
         
         # Add existing libraries
@@ -602,6 +712,7 @@ class ReadWiseApp:
             label="Search books...",
             width=500,
             on_change=self.search_books,
+            on_submit=self.submit_search,
             prefix_icon=ft.Icons.SEARCH,
             bgcolor=theme_colors["surface"],
             color=theme_colors["text"],
@@ -724,7 +835,7 @@ class ReadWiseApp:
         dnf_list = ft.ListView(expand=1, spacing=10, padding=20)
         
         for book in dnf_books:
-            dnf_list.controls.append(self.create_book_card(book))
+            dnf_list.controls.append(self.get_book_card(book))
         
         if not dnf_books:
             dnf_list.controls.append(
@@ -898,6 +1009,8 @@ class ReadWiseApp:
     def show_settings_view(self):
         """Show settings with theme selector"""
         theme_colors = self.get_theme_colors()
+        self.enrichment_progress = ft.ProgressBar(width=400, value=0, visible=self.enrichment_job is not None,
+                                                  color=theme_colors["primary"])
         
         # Create theme selector dropdown
         theme_options = [
@@ -940,6 +1053,103 @@ class ReadWiseApp:
                 
                 ft.Container(height=30),
                 
+                # Saving section
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.Text("💾 Saving", size=20, weight=ft.FontWeight.BOLD, color=theme_colors["text"]),
+                            ft.Container(height=10),
+                            ft.Row([
+                                ft.Dropdown(
+                                    label="Save changes",
+                                    width=300,
+                                    value=self.library_manager.persistence.mode,
+                                    options=[
+                                        ft.dropdown.Option(key="immediate", text="Immediately"),
+                                        ft.dropdown.Option(key="debounced", text="In the background"),
+                                        ft.dropdown.Option(key="manual", text="Only when I click Save"),
+                                    ],
+                                    on_change=self.on_durability_change,
+                                    bgcolor=ft.Colors.WHITE,
+                                    color=ft.Colors.BLACK,
+                                    border_color=theme_colors["primary"],
+                                ),
+                                ft.ElevatedButton(
+                                    "Save now",
+                                    icon=ft.Icons.SAVE,
+                                    on_click=self.save_now,
+                                    bgcolor=theme_colors["primary"],
+                                    color=theme_colors["background"],
+                                ),
+                            ], spacing=10),
+                        ], spacing=10),
+                        padding=20,
+                        bgcolor=theme_colors["surface"],
+                    ),
+                    elevation=2,
+                ),
+                
+                ft.Container(height=30),
+                
+                # Book lookup section
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.Text("🌐 Book Lookups", size=20, weight=ft.FontWeight.BOLD, color=theme_colors["text"]),
+                            ft.Container(height=10),
+                            ft.Switch(
+                                label="Offline mode (only use saved lookups)",
+                                value=self.offline_mode,
+                                on_change=self.on_offline_mode_change,
+                            ),
+                            ft.Row([
+                                ft.Text(f"{self.get_api_cache().stats()['entries']} saved lookups",
+                                       size=14, color=theme_colors["accent"]),
+                                ft.TextButton("Clear", icon=ft.Icons.DELETE_OUTLINE, on_click=self.clear_api_cache),
+                            ], spacing=10),
+                            ft.ElevatedButton(
+                                "Fill in missing book details",
+                                icon=ft.Icons.AUTO_FIX_HIGH,
+                                on_click=self.enrich_current_library,
+                                bgcolor=theme_colors["primary"],
+                                color=theme_colors["background"],
+                            ),
+                            self.enrichment_progress,
+                        ], spacing=10),
+                        padding=20,
+                        bgcolor=theme_colors["surface"],
+                    ),
+                    elevation=2,
+                ),
+                
+                ft.Container(height=30),
+                
+                # Diagnostics section
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.Text("🩺 Diagnostics", size=20, weight=ft.FontWeight.BOLD, color=theme_colors["text"]),
+                            ft.Container(height=10),
+                            ft.Switch(
+                                label="Record timings",
+                                value=INSTRUMENTATION.enabled,
+                                on_change=self.on_instrumentation_change,
+                            ),
+                            *self.create_diagnostics_rows(theme_colors),
+                            ft.Row([
+                                ft.TextButton("Refresh", icon=ft.Icons.REFRESH, on_click=self.refresh_diagnostics),
+                                ft.TextButton("Save report", icon=ft.Icons.SAVE_ALT, on_click=self.save_diagnostics),
+                                ft.TextButton("Reset", icon=ft.Icons.RESTART_ALT, on_click=self.reset_diagnostics),
+                            ], spacing=10),
+                        ], spacing=10),
+                        padding=20,
+                        bgcolor=theme_colors["surface"],
+                    ),
+                    elevation=2,
+                ),
+                
+                ft.Container(height=30),
+                
                 # App info section
                 ft.Card(
                     content=ft.Container(
@@ -962,6 +1172,159 @@ class ReadWiseApp:
             bgcolor=theme_colors["background"],
         )
     
+    def on_app_close(self, e):
+        """Flush queued library writes when the app closes"""
+        self.library_manager.flush()
+        if self.library_ready:
+            self.save_startup_snapshot()
+    
+    def on_durability_change(self, e):
+        """Handle save mode change from dropdown"""
+        self.library_manager.set_durability(e.control.value)
+    
+    def save_now(self, e):
+        """Write all queued library changes immediately"""
+        self.library_manager.flush()
+    
+    def show_save_error(self, error):
+        """Tell the user a change is kept but could not be written to the database yet"""
+        print(f"⚠️ {error}")
+        page = self.content_area.page
+        if not page:
+            return
+        snack_bar = ft.SnackBar(ft.Text("Couldn't write your change to the library database. "
+                                        "It is kept and will be saved again on the next save."))
+        page.overlay.append(snack_bar)
+        snack_bar.open = True
+        page.update()
+    
+    def on_offline_mode_change(self, e):
+        """Answer book lookups from the local cache only"""
+        self.offline_mode = bool(e.control.value)
+        self.get_api_cache().offline = self.offline_mode
+        self.save_setting("offline_mode", self.offline_mode)
+    
+    def clear_api_cache(self, e):
+        """Forget every saved book lookup"""
+        self.get_api_cache().clear()
+        self.show_settings_view()
+        self.content_area.page.update()
+    
+    def diagnostics_extra(self):
+        """Cache and provider state that goes along with the timings in a diagnostics report"""
+        extra = {
+            'providers': provider_stats(),
+            'api_cache': self.api_cache.stats() if self.api_cache else None,
+            'book_client': self.book_client.stats() if self.book_client else None,
+            'persistence': {'mode': self.library_manager.persistence.mode,
+                            'writes': self.library_manager.persistence.writes,
+                            'coalesced': self.library_manager.persistence.coalesced},
+            'card_cache': len(self.card_cache),
+        }
+        library = self.library_manager.libraries.get(self.library_manager.current_library_id)
+        if library:
+            extra['library'] = {'books': len(library.books), 'query_cache': library.query_cache.stats()}
+        return extra
+    
+    def create_diagnostics_rows(self, theme_colors):
+        """Slowest operations plus cache and provider state, as text rows for the diagnostics card"""
+        snapshot = INSTRUMENTATION.snapshot()
+        extra = self.diagnostics_extra()
+        lines = []
+        for name, timer in list(snapshot['timers'].items())[:8]:
+            lines.append(f"{name}: {timer['count']}× · mean {timer['mean_ms']:.1f} ms · "
+                         f"p95 {timer['p95_ms']:.0f} ms · max {timer['max_ms']:.0f} ms")
+        if not lines:
+            lines.append("No timings recorded yet" if INSTRUMENTATION.enabled else "Timings are off")
+        if snapshot['slow_operations']:
+            lines.append(f"{len(snapshot['slow_operations'])} operations slower than {snapshot['slow_threshold_ms']:.0f} ms")
+        if 'library' in extra:
+            cache = extra['library']['query_cache']
+            lines.append(f"Query cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']} entries")
+        lines.append("Lookups: " + ", ".join(f"{key} {stats['calls']} calls ({stats['circuit']})"
+                                             for key, stats in extra['providers'].items()))
+        return [ft.Text(line, size=12, color=theme_colors["accent"]) for line in lines]
+    
+    def on_instrumentation_change(self, e):
+        """Turn hot-path timings on or off"""
+        INSTRUMENTATION.enabled = bool(e.control.value)
+        self.save_setting("instrumentation", INSTRUMENTATION.enabled)
+    
+    def refresh_diagnostics(self, e):
+        self.show_settings_view()
+        self.content_area.page.update()
+    
+    def save_diagnostics(self, e):
+        """Write timings, counters and cache state to diagnostics.json in the data folder"""
+        filename = os.path.join(self.data_path, "diagnostics.json")
+        if INSTRUMENTATION.dump(filename, self.diagnostics_extra()):
+            print(f"🩺 Diagnostics saved to {filename}")
+    
+    def reset_diagnostics(self, e):
+        INSTRUMENTATION.reset()
+        self.refresh_diagnostics(e)
+    
+    def get_api_cache(self):
+        """The on-disk lookup cache, opened on first use"""
+        with self.client_lock:
+            if self.api_cache is None:
+                from utils.response_cache import ResponseCache
+                self.api_cache = ResponseCache(os.path.join(self.data_path, "api_cache.db"), offline=self.offline_mode)
+                # The synchronous client shares it, offline mode included
+                try:
+                    from utils.book_api import BookAPI
+                    BookAPI.cache = self.api_cache
+                except ImportError:  # BookAPI needs requests; the app's own lookups don't
+                    pass
+            return self.api_cache
+    
+    def get_book_client(self):
+        """The ISBN lookup client, created (and asyncio imported) on the first lookup"""
+        api_cache = self.get_api_cache()
+        with self.client_lock:
+            if self.book_client is None:
+                from utils.async_book_api import AsyncBookAPI
+                self.book_client = AsyncBookAPI(cache=api_cache)
+            return self.book_client
+    
+    def enrich_current_library(self, e):
+        """Look up covers, page counts and genres for books with an ISBN that are missing them"""
+        library = self.library_manager.get_current_library()
+        if not library or self.enrichment_job:
+            return
+        from models.enrichment import EnrichmentJob
+        # Resumes from the checkpoint if an earlier run was interrupted
+        self.enrichment_job = EnrichmentJob(library, self.get_book_client(), progress=self.on_enrichment_progress)
+        threading.Thread(target=self.run_enrichment, args=(self.enrichment_job,), daemon=True).start()
+    
+    def run_enrichment(self, job):
+        try:
+            summary = job.run()
+            print(f"📚 Filled in details for {summary['updated']} of {summary['books']} books")
+            if summary['save_error']:
+                self.show_save_error(summary['save_error'])
+        except Exception as ex:
+            print(f"Error enriching library: {ex}")
+        finally:
+            self.enrichment_job = None
+        try:
+            if self.enrichment_progress:
+                self.enrichment_progress.visible = False
+            if self.current_view == "library":
+                self.refresh_book_list()
+            else:
+                self.content_area.page.update()
+        except Exception as ex:
+            print(f"Error refreshing after enrichment: {ex}")
+    
+    def on_enrichment_progress(self, done, total):
+        """Progress callback from the enrichment worker thread"""
+        if not self.enrichment_progress or not self.enrichment_progress.page:
+            return
+        self.enrichment_progress.visible = True
+        self.enrichment_progress.value = done / total if total else 1
+        self.enrichment_progress.update()
+    
     def on_theme_change(self, e):
         """Handle theme change from dropdown"""
         selected_theme = e.control.value
@@ -1005,6 +1368,7 @@ class ReadWiseApp:
             color=theme_colors["surface"]
         )
     
+    @timed("ui.create_book_card")
     def create_book_card(self, book):
         """Create a book card"""
         theme_colors = self.get_theme_colors()
@@ -1067,6 +1431,7 @@ class ReadWiseApp:
             text="Edit",
             icon=ft.Icons.EDIT,
             on_click=lambda e: self.show_edit_book_dialog(book),
+            disabled=self.is_startup_book(book),
             height=30,
             bgcolor=theme_colors["primary"],
             color=theme_colors["background"],
@@ -1080,9 +1445,19 @@ class ReadWiseApp:
             margin=ft.margin.only(top=10)
         ))
         
+        card_content = ft.Column(book_info, spacing=8)
+        
+        # Cover thumbnail, once it is in the local cover cache (prefetched in the background)
+        cover = self.cover_cache.thumbnail_base64(book.cover_url) if book.cover_url else None
+        if cover:
+            card_content = ft.Row([
+                ft.Image(src_base64=cover, width=64, height=96, fit=ft.ImageFit.COVER, border_radius=4),
+                ft.Column(book_info, spacing=8, expand=True),
+            ], spacing=16, vertical_alignment=ft.CrossAxisAlignment.START)
+        
         return ft.Card(
             content=ft.Container(
-                content=ft.Column(book_info, spacing=8),
+                content=card_content,
                 padding=20,
                 bgcolor=theme_colors["surface"],
             ),
@@ -1090,58 +1465,35 @@ class ReadWiseApp:
             color=theme_colors["surface"]
         )
     
-    def refresh_book_list(self):
-        """Refresh the book list display"""
-        # Apply filters
-        current_library = self.library_manager.get_current_library()
-        if not current_library:
+    def book_card_signature(self, book):
+        """Everything a book card displays; the cached card is reused while this is unchanged"""
+        return (book.title, book.author, tuple(book.genre), book.status, book.rating,
+                book.total_pages, book.pages_read, book.review, self.current_theme,
+                book.cover_url, self.cover_cache.is_ready(book.cover_url))
+    
+    def get_book_card(self, book):
+        """Return the cached card for a book, rebuilding it only if the book changed"""
+        signature = self.book_card_signature(book)
+        cached = self.card_cache.get(id(book))
+        if cached and cached[0] is book and cached[1] == signature:
+            return cached[2]
+        card = self.create_book_card(book)
+        self.card_cache[id(book)] = (book, signature, card)
+        return card
+    
+    def prune_card_cache(self, *book_lists):
+        """Drop cards for books that are in none of the given lists (the library and the DNF view)"""
+        book_count = sum(len(books) for books in book_lists)
+        if len(self.card_cache) <= 2 * book_count + BOOK_LIST_PAGE_SIZE:
             return
-        books_to_show = current_library.books.copy()
-        
-        # Search filter
-        if self.search_field.value:
-            search_query = self.search_field.value.lower()
-            books_to_show = [
-                book for book in books_to_show
-                if (search_query in book.title.lower() or
-                    search_query in book.author.lower() or
-                    any(search_query in genre.lower() for genre in book.genre))
-            ]
-        
-        # Status filter
-        if self.status_filter.value and self.status_filter.value != "All":
-            books_to_show = [book for book in books_to_show if book.status == self.status_filter.value]
-        
-        # Rating filter
-        if self.rating_filter.value and self.rating_filter.value != "All":
-            if self.rating_filter.value == "Unrated":
-                books_to_show = [book for book in books_to_show if book.rating == 0]
-            else:
-                rating = int(self.rating_filter.value[0])
-                books_to_show = [book for book in books_to_show if book.rating == rating]
-        
-        # Sort books based on selected option
-        if self.sort_dropdown.value == "Status":
-            # Custom order: Currently Reading → To Be Read → Finished
-            status_order = {"Currently Reading": 0, "To Be Read": 1, "Finished": 2, "Did Not Finish": 3}
-            books_to_show.sort(key=lambda book: (status_order.get(book.status, 4), book.title.lower()))
-        elif self.sort_dropdown.value == "Name (A-Z)":
-            books_to_show.sort(key=lambda book: book.title.lower())
-        elif self.sort_dropdown.value == "Author":
-            books_to_show.sort(key=lambda book: book.author.lower())
-        elif self.sort_dropdown.value == "Genre":
-            books_to_show.sort(key=lambda book: book.genre[0].lower() if book.genre else "zzz")
-        elif self.sort_dropdown.value == "Rating":
-            books_to_show.sort(key=lambda book: book.rating, reverse=True)  # Highest first
-        elif self.sort_dropdown.value == "Date Added":
-            # For now, sort by title as we don't have date_added field yet
-            books_to_show.sort(key=lambda book: book.title.lower(), reverse=True)
-        
-        # Clear and populate book list
-        self.book_list.controls.clear()
-        
-        if not books_to_show:
-            self.book_list.controls.append(
+        live = {id(book) for books in book_lists for book in books}
+        self.card_cache = {key: entry for key, entry in self.card_cache.items() if key in live}
+    
+    @timed("ui.render_book_window")
+    def render_book_window(self):
+        """Materialize cards for the rendered part of the list and push only if something changed"""
+        if not self.visible_books:
+            controls = [
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(ft.Icons.SEARCH_OFF, size=64, color=ft.Colors.GREY_400),
@@ -1150,17 +1502,79 @@ class ReadWiseApp:
                     padding=40,
                     alignment=ft.alignment.center,
                 )
-            )
+            ]
         else:
-            for book in books_to_show:
-                self.book_list.controls.append(self.create_book_card(book))
+            window = self.visible_books[:self.rendered_count]
+            controls = [self.get_book_card(book) for book in window]
+            # Fetch missing covers for this window; cards pick them up on the re-render
+            self.cover_cache.prefetch([book.cover_url for book in window], on_complete=self.render_book_window)
+        
+        current = self.book_list.controls
+        if self.visible_books and len(current) == len(controls) and all(a is b for a, b in zip(current, controls)):
+            return  # Same cards in the same order, nothing to send
         
+        self.book_list.controls = controls
+        # Cards are reused, so Flet's diff only sends the ones that are new to the client
         if self.book_list.page:
             self.book_list.page.update()
     
+    def on_book_list_scroll(self, e):
+        """Render the next page of cards when the user scrolls close to the end"""
+        if self.rendered_count >= len(self.visible_books):
+            return
+        if e.max_scroll_extent is not None and e.pixels < e.max_scroll_extent - BOOK_LIST_PREFETCH_PIXELS:
+            return
+        self.rendered_count = min(len(self.visible_books), self.rendered_count + BOOK_LIST_PAGE_SIZE)
+        self.render_book_window()
+    
+    @timed("ui.refresh_book_list")
+    def refresh_book_list(self, token=None, search=None):
+        """Refresh the book list display (a search token stops the work once it is superseded).
+
+        `search` is the query a debounced run was submitted with; other refreshes read the field.
+        """
+        # Until the startup load finishes it refreshes the list itself, with whatever filters are set by then
+        if not self.library_ready:
+            return
+        # Apply filters
+        current_library = self.library_manager.get_current_library()
+        if not current_library:
+            return
+        # Status and rating filters (None means any, 0 means unrated)
+        status = self.status_filter.value if self.status_filter.value and self.status_filter.value != "All" else None
+        rating = None
+        if self.rating_filter.value and self.rating_filter.value != "All":
+            rating = 0 if self.rating_filter.value == "Unrated" else int(self.rating_filter.value[0])
+        
+        # Search, filter and sort, served from the library's query cache while nothing changed
+        if search is None:
+            search = self.search_field.value or ""
+        books_to_show = current_library.query_books(search, status, rating, self.sort_dropdown.value)
+        
+        # Checked right before touching the list: a superseded run must leave it alone. A run
+        # cancelled after this point is followed by the newer one, which waits for it to finish
+        if token and token.cancelled:
+            return
+        
+        # Render the first window of cards (more follow on scroll), reusing cached cards;
+        # a new search starts from the top
+        rendered_count = 0 if token else self.rendered_count
+        self.visible_books = books_to_show
+        self.rendered_count = min(len(books_to_show), max(rendered_count, BOOK_LIST_PAGE_SIZE))
+        self.prune_card_cache(current_library.books, self.library_manager.get_dnf_books())
+        self.render_book_window()
+    
     def search_books(self, e):
-        """Handle search input"""
-        self.refresh_book_list()
+        """Handle search input (debounced)"""
+        self.search_scheduler.submit(self.search_field.value)
+    
+    def submit_search(self, e):
+        """Run the search right away when Enter is pressed"""
+        self.search_scheduler.submit(self.search_field.value, delay=0)
+    
+    def run_search(self, query, token):
+        """Debounced search run: start the results from the top and render the first page"""
+        self.refresh_book_list(token, query)
     
     def filter_books(self, e):
         """Handle filter changes"""
@@ -1204,7 +1618,11 @@ class ReadWiseApp:
             # Add to library
             current_library = self.library_manager.get_current_library()
             if current_library:
-                current_library.add_book(new_book)
+                try:
+                    current_library.add_book(new_book)
+                except StoreWriteError as ex:
+                    # The book is in the library; only its database row is behind
+                    self.show_save_error(ex)
             
             # Close dialog and refresh
             self.close_add_dialog(e)
@@ -1219,7 +1637,7 @@ class ReadWiseApp:
             return
             
         try:
-            book_data = BookAPI.lookup_isbn(self.isbn_field.value.strip())
+            book_data = self.get_book_client().lookup_isbn_sync(self.isbn_field.value.strip())
             if book_data:
                 # Fill in the fields
                 self.title_field.value = book_data.get('title', '')
@@ -1246,6 +1664,8 @@ class ReadWiseApp:
     
     def show_edit_book_dialog(self, book):
         """Show edit book dialog"""
+        if not self.library_ready or self.is_startup_book(book):
+            return  # Cards from the startup snapshot aren't the library's books
         try:
             print(f"Edit button clicked for: {book.title}")
             self.selected_book = book
@@ -1399,15 +1819,19 @@ class ReadWiseApp:
             if not current_library:
                 return
                 
-            if old_status != "Did Not Finish" and new_status == "Did Not Finish":
-                # Moving from current library to DNF
-                current_library.move_to_dnf(self.selected_book)
-            elif old_status == "Did Not Finish" and new_status != "Did Not Finish":
-                # Moving from DNF back to current library
-                current_library.move_from_dnf(self.selected_book)
-            else:
-                # Status didn't change libraries, just update
-                current_library.update_book(self.selected_book)
+            try:
+                if old_status != "Did Not Finish" and new_status == "Did Not Finish":
+                    # Moving from current library to DNF
+                    current_library.move_to_dnf(self.selected_book)
+                elif old_status == "Did Not Finish" and new_status != "Did Not Finish":
+                    # Moving from DNF back to current library
+                    current_library.move_from_dnf(self.selected_book)
+                else:
+                    # Status didn't change libraries, just update
+                    current_library.update_book(self.selected_book)
+            except StoreWriteError as ex:
+                # The edit is applied; only the database is behind
+                self.show_save_error(ex)
             
             # Close dialog and refresh
             try:
@@ -0,0 +1,335 @@
+import os
+import gc
+import sys
+import mmap
+import struct
+import threading
+from typing import List, Optional, Tuple
+from .book import Book
+from utils.atomic_write import atomic_write, backup_paths
+
+MAGIC = b"RWBK"
+FORMAT_VERSION = 2
+
+# magic, format version, flags, record count, string count, genre set count, library name id,
+# string table offset, record offset table offset, then (since version 2) the sequence number
+# of the last journal record the snapshot contains
+HEADER = struct.Struct("<4sHHIIIIQQQ")
+HEADER_V1 = struct.Struct("<4sHHIIIIQQ")
+PREFIX = struct.Struct("<4sH")
+# record length, author id, status id, genre set id, rating, total pages, pages read, reading
+# time, date started, date finished, then the UTF-8 size of the text that follows the record
+# and the length in characters of each of its parts: title, review, isbn, cover url
+RECORD = struct.Struct("<IIIIBiiqiiIIIII")
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+# Book's slots are laid out in from_stored argument order
+STORED_FIELDS = Book.__slots__
+STORED_INDEX = {name: index for index, name in enumerate(STORED_FIELDS)}
+
+class SnapshotFormatError(ValueError):
+    """The file is not a binary snapshot this version can read"""
+
+class StringTable:
+    """Shared values, each stored once and referenced by id: strings (authors, genres, statuses,
+    non-ISO dates) and genre lists, which repeat across a library as whole combinations"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings: List[str] = []
+        self.genre_set_ids = {}
+        self.genre_sets: List[Tuple[int, ...]] = []
+
+    def id(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def genre_set_id(self, genres: List[str]) -> int:
+        key = tuple(genres)
+        set_id = self.genre_set_ids.get(key)
+        if set_id is None:
+            set_id = self.genre_set_ids[key] = len(self.genre_sets)
+            self.genre_sets.append(tuple(self.id(genre) for genre in genres))
+        return set_id
+
+    def encode(self) -> bytes:
+        parts = []
+        for value in self.strings:
+            data = value.encode('utf-8')
+            parts.append(U32.pack(len(data)))
+            parts.append(data)
+        for string_ids in self.genre_sets:
+            parts.append(struct.pack(f"<I{len(string_ids)}I", len(string_ids), *string_ids))
+        return b''.join(parts)
+
+def decode_tables(buffer, offset: int, string_count: int, genre_set_count: int) -> Tuple[List[str], List[Tuple[str, ...]]]:
+    strings = []
+    for _ in range(string_count):
+        (length,) = U32.unpack_from(buffer, offset)
+        offset += 4
+        # Interned like Book does for statuses and genres, so every copy shares one object
+        strings.append(sys.intern(str(buffer[offset:offset + length], 'utf-8')))
+        offset += length
+    genre_sets = []
+    for _ in range(genre_set_count):
+        (length,) = U32.unpack_from(buffer, offset)
+        genre_sets.append(tuple(strings[string_id] for string_id in struct.unpack_from(f"<{length}I", buffer, offset + 4)))
+        offset += 4 + 4 * length
+    return strings, genre_sets
+
+def encode_date(stored, strings: StringTable) -> int:
+    """Book keeps dates as ordinals (0 = none); other text goes to the string table as -1 - id"""
+    return stored if isinstance(stored, int) else -1 - strings.id(stored)
+
+def encode_books(library_name: str, books: List[Book], journal_sequence: int = 0) -> bytes:
+    strings = StringTable()
+    name_id = strings.id(library_name)
+    records = []
+    offsets = []
+    position = HEADER.size
+    for book in books:
+        (title, author, genre, status, rating, review, total_pages, pages_read, date_started, date_finished,
+         reading_time, isbn, cover_url) = book.stored()
+        # One UTF-8 run per record, so reading it back is a single decode
+        text = (title + review + isbn + cover_url).encode('utf-8')
+        length = RECORD.size + len(text)
+        records.append(RECORD.pack(
+            length, strings.id(author), strings.id(status), strings.genre_set_id(genre),
+            rating, total_pages, pages_read, reading_time,
+            encode_date(date_started, strings), encode_date(date_finished, strings),
+            len(text), len(title), len(review), len(isbn), len(cover_url)))
+        records.append(text)
+        offsets.append(position)
+        position += length
+
+    string_offset = position
+    string_data = strings.encode()
+    index_offset = string_offset + len(string_data)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(offsets), len(strings.strings), len(strings.genre_sets),
+                         name_id, string_offset, index_offset, journal_sequence)
+    index = struct.pack(f"<{len(offsets)}Q", *offsets)
+    return b''.join([header, *records, string_data, index])
+
+def write_snapshot(path: str, library_name: str, books: List[Book], backups: int = 0,
+                   journal_sequence: int = 0):
+    data = encode_books(library_name, books, journal_sequence)
+    with atomic_write(path, 'wb', backups=backups) as file:
+        file.write(data)
+
+class SnapshotReader:
+    """Random access to the records of a binary snapshot through a read-only memory map.
+
+    The string table and record offsets are decoded on open; records are only
+    decoded when asked for, so reading one book costs the same in any file size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER_V1.size:
+                raise SnapshotFormatError(f"{path} is too short to be a library snapshot")
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version = PREFIX.unpack_from(self.buffer, 0)
+            if magic != MAGIC:
+                raise SnapshotFormatError(f"{path} is not a library snapshot")
+            if version > FORMAT_VERSION:
+                raise SnapshotFormatError(f"{path} was written by a newer version (format {version})")
+            if version == 1:
+                header = HEADER_V1.unpack_from(self.buffer, 0) + (0,)
+            else:
+                header = HEADER.unpack_from(self.buffer, 0)
+            (_magic, _version, _flags, self.count, string_count, genre_set_count, name_id,
+             string_offset, index_offset, self.journal_sequence) = header
+            if index_offset + 8 * self.count != size:
+                raise SnapshotFormatError(f"{path} is truncated or corrupt")
+            self.strings, self.genre_sets = decode_tables(self.buffer, string_offset, string_count, genre_set_count)
+            self.library_name = self.strings[name_id]
+            self.offsets = struct.unpack_from(f"<{self.count}Q", self.buffer, index_offset)
+            # The last record decoded through fields(); a proxy reads several fields in a row
+            self.last = (-1, None)
+        except BaseException:
+            self.buffer.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.count
+
+    def fields(self, position: int) -> Tuple:
+        """Decoded stored values of one record, in Book.from_stored argument order"""
+        last_position, last_fields = self.last
+        if last_position == position:
+            return last_fields
+        fields = self._decode(self.offsets[position])
+        self.last = (position, fields)
+        return fields
+
+    def _decode(self, offset: int) -> Tuple:
+        (_length, author_id, status_id, genre_set_id, rating, total_pages, pages_read, reading_time,
+         date_started, date_finished, text_size, title_length, review_length, isbn_length,
+         cover_url_length) = RECORD.unpack_from(self.buffer, offset)
+        offset += RECORD.size
+        text = str(self.buffer[offset:offset + text_size], 'utf-8')
+        review_end = title_length + review_length
+        isbn_end = review_end + isbn_length
+        strings = self.strings
+        return (text[:title_length], strings[author_id], list(self.genre_sets[genre_set_id]), strings[status_id],
+                rating, text[title_length:review_end], total_pages, pages_read,
+                date_started if date_started >= 0 else strings[-1 - date_started],
+                date_finished if date_finished >= 0 else strings[-1 - date_finished],
+                reading_time, text[review_end:isbn_end], text[isbn_end:isbn_end + cover_url_length])
+
+    def sort_fields(self, position: int) -> Tuple:
+        """Book.sort_fields() of one record, without decoding its review or other text"""
+        offset = self.offsets[position]
+        (_length, author_id, status_id, genre_set_id, rating, _total_pages, _pages_read, _reading_time,
+         _date_started, _date_finished, text_size, title_length, review_length, isbn_length,
+         cover_url_length) = RECORD.unpack_from(self.buffer, offset)
+        offset += RECORD.size
+        if text_size == title_length + review_length + isbn_length + cover_url_length:
+            # ASCII text: one byte per character, so the title's bytes are known
+            title = str(self.buffer[offset:offset + title_length], 'ascii')
+        else:
+            title = str(self.buffer[offset:offset + text_size], 'utf-8')[:title_length]
+        strings = self.strings
+        return title, strings[author_id], self.genre_sets[genre_set_id], strings[status_id], rating
+
+    def book(self, position: int) -> Book:
+        return Book.from_stored(*self._decode(self.offsets[position]))
+
+    def books(self) -> List[Book]:
+        from_stored = Book.from_stored
+        decode = self._decode
+        # Books hold no reference cycles, so collection passes while allocating them all are wasted work
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return [from_stored(*decode(offset)) for offset in self.offsets]
+        finally:
+            if collecting:
+                gc.enable()
+
+    def lazy_books(self) -> List["LazyBook"]:
+        """One proxy per record, in file order; nothing is decoded until a field is read"""
+        return [LazyBook(self, position) for position in range(self.count)]
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# Serializes promote() against attach(): both check the record and then replace it
+RECORD_LOCK = threading.Lock()
+
+class LazyBook(Book):
+    """A Book that reads its fields from a snapshot record instead of holding them.
+
+    Until it is edited a proxy keeps only its (reader, record position) pair, and
+    every field access decodes the record (the reader remembers the last one).
+    Setting any field promotes it: all fields are decoded into the Book's own
+    slots once and it is an ordinary Book from then on, journaled like any other.
+    The pair is one attribute, so a reader never sees a reader from one file with
+    a position from another while a save moves the proxies to the new file.
+    """
+
+    __slots__ = ('_record',)
+
+    def __init__(self, reader: SnapshotReader, position: int):
+        object.__setattr__(self, '_record', (reader, position))
+
+    def __getattr__(self, name: str):
+        # Only reached for Book slots that are still unset, i.e. before promotion
+        index = STORED_INDEX.get(name)
+        record = self._record
+        if index is None or record is None:
+            raise AttributeError(name)
+        reader, position = record
+        return reader.fields(position)[index]
+
+    def __setattr__(self, name: str, value):
+        if name in STORED_INDEX and self._record is not None:
+            self.promote()
+        object.__setattr__(self, name, value)
+
+    def promote(self):
+        """Decode every field into this book's slots and detach it from the snapshot"""
+        # Edits promote outside the library lock while a save may be re-attaching proxies
+        with RECORD_LOCK:
+            record = self._record
+            if record is None:
+                return
+            reader, position = record
+            fields = reader.fields(position)
+            for name, value in zip(STORED_FIELDS, fields):
+                object.__setattr__(self, name, value)
+            # The reader's last record shares this list; an in-place genre edit must not leak into it
+            object.__setattr__(self, '_genre', list(fields[STORED_INDEX['_genre']]))
+            object.__setattr__(self, '_record', None)
+
+    def attach(self, reader: SnapshotReader, position: int):
+        """Point an unpromoted proxy at the same record in another snapshot file"""
+        with RECORD_LOCK:
+            # A proxy promoted in the meantime keeps its edits and stays detached
+            if self._record is not None:
+                object.__setattr__(self, '_record', (reader, position))
+
+    def stored(self) -> tuple:
+        record = self._record
+        if record is not None:
+            reader, position = record
+            return reader.fields(position)
+        return Book.stored(self)
+
+    def sort_fields(self) -> tuple:
+        record = self._record
+        if record is not None:
+            reader, position = record
+            return reader.sort_fields(position)
+        return Book.sort_fields(self)
+
+    @property
+    def mapped(self) -> bool:
+        """Whether the book still reads its fields from the snapshot"""
+        return self._record is not None
+
+def remap_books(books: List[Book], path: str):
+    """Move the unpromoted proxies in `books` onto a snapshot just written from that list,
+    so the previous file's mapping can be released"""
+    reader = SnapshotReader(path)
+    for position, book in enumerate(books):
+        if type(book) is LazyBook:
+            book.attach(reader, position)
+
+def read_snapshot(path: str) -> Tuple[str, List[Book]]:
+    """(library name, books) from a binary snapshot"""
+    with SnapshotReader(path) as reader:
+        return reader.library_name, reader.books()
+
+def load_snapshot_with_recovery(path: str, backups: int = 0,
+                                lazy: bool = False) -> Tuple[Optional[List[Book]], int, Optional[str]]:
+    """Books and journal sequence from the newest generation of a binary snapshot that reads,
+    and the path they came from.
+
+    With `lazy` the books are LazyBook proxies over a mapping that stays open as long as they do.
+    """
+    for candidate in [path] + backup_paths(path, backups):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            reader = SnapshotReader(candidate)
+            if lazy:
+                return reader.lazy_books(), reader.journal_sequence, candidate
+            with reader:
+                return reader.books(), reader.journal_sequence, candidate
+        except (OSError, ValueError, struct.error, IndexError) as e:
+            print(f"⚠️ Could not read {candidate}: {e}")
+    return None, 0, None
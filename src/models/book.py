@@ -1,14 +1,36 @@
-from datetime import datetime
-from typing import List, Optional
+import sys
+from datetime import datetime, date
+from typing import List, Optional, Union
+
+def date_to_ordinal(value: str) -> Union[int, str]:
+    """Pack a "%Y-%m-%d" date into its ordinal (0 for no date), keeping any other text as-is"""
+    if not value:
+        return 0
+    try:
+        parsed = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    return parsed.toordinal() if parsed.isoformat() == value else value
+
+def ordinal_to_date(value: Union[int, str]) -> str:
+    if isinstance(value, str):
+        return value
+    return date.fromordinal(value).isoformat() if value else ""
 
 class Book:
+    # Slots instead of a per-instance __dict__; dates are stored as ordinals behind properties,
+    # genres and status interned behind properties
+    __slots__ = ('title', 'author', '_genre', '_status', 'rating', 'review', 'total_pages',
+                 'pages_read', '_date_started', '_date_finished', 'reading_time_minutes',
+                 'isbn', 'cover_url')
+
     def __init__(self, title: str, author: str, genre: List[str], status: str = "To Be Read", 
                  rating: int = 0, review: str = "", total_pages: int = 0, 
                  pages_read: int = 0, date_started: str = "", date_finished: str = "",
                  reading_time_minutes: int = 0, isbn: str = "", cover_url: str = ""):
         self.title = title
         self.author = author
-        self.genre = genre if isinstance(genre, list) else [genre]
+        self.genre = genre
         self.status = status
         self.rating = rating  # 0-5 stars
         self.review = review
@@ -20,6 +42,40 @@ class Book:
         self.isbn = isbn
         self.cover_url = cover_url
 
+    @property
+    def genre(self) -> List[str]:
+        return self._genre
+
+    @genre.setter
+    def genre(self, value: List[str]):
+        # Status and genre values repeat across a library, so share one string object each,
+        # edits included
+        self._genre = [sys.intern(g) for g in value] if isinstance(value, list) else [sys.intern(value)]
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = sys.intern(value)
+
+    @property
+    def date_started(self) -> str:
+        return ordinal_to_date(self._date_started)
+
+    @date_started.setter
+    def date_started(self, value: str):
+        self._date_started = date_to_ordinal(value)
+
+    @property
+    def date_finished(self) -> str:
+        return ordinal_to_date(self._date_finished)
+
+    @date_finished.setter
+    def date_finished(self, value: str):
+        self._date_finished = date_to_ordinal(value)
+
     def mark_as_finished(self, finish_date: str = None):
         self.status = "Finished"
         if finish_date:
@@ -67,7 +123,7 @@ class Book:
         return self.reading_time_minutes / 60.0 if self.reading_time_minutes > 0 else 0.0
     
     def is_currently_reading(self) -> bool:
-        return self.date_started != "" and self.date_finished == "" and self.status not in ["Finished", "Did Not Finish"]
+        return bool(self._date_started) and not self._date_finished and self.status not in ["Finished", "Did Not Finish"]
 
     def __str__(self):
         progress = f" ({self.get_progress_percentage():.1f}%)" if self.total_pages > 0 else ""
@@ -91,6 +147,37 @@ class Book:
             'cover_url': self.cover_url
         }
     
+    def stored(self) -> tuple:
+        """Field values in stored form (dates as ordinals), in from_stored argument order"""
+        return (self.title, self.author, self._genre, self._status, self.rating, self.review, self.total_pages,
+                self.pages_read, self._date_started, self._date_finished, self.reading_time_minutes,
+                self.isbn, self.cover_url)
+    
+    def sort_fields(self) -> tuple:
+        """(title, author, genres, status, rating): what the library view sorts by"""
+        return self.title, self.author, self._genre, self._status, self.rating
+    
+    @classmethod
+    def from_stored(cls, title: str, author: str, genre: List[str], status: str, rating: int, review: str,
+                    total_pages: int, pages_read: int, date_started: Union[int, str], date_finished: Union[int, str],
+                    reading_time_minutes: int, isbn: str, cover_url: str):
+        """Rebuild a Book from values already in stored form (dates as ordinals), skipping validation"""
+        book = cls.__new__(cls)
+        book.title = title
+        book.author = author
+        book._genre = genre
+        book._status = status
+        book.rating = rating
+        book.review = review
+        book.total_pages = total_pages
+        book.pages_read = pages_read
+        book._date_started = date_started
+        book._date_finished = date_finished
+        book.reading_time_minutes = reading_time_minutes
+        book.isbn = isbn
+        book.cover_url = cover_url
+        return book
+    
     @classmethod
     def from_dict(cls, data: dict):
         return cls(
@@ -0,0 +1,119 @@
+from typing import List, Dict, Union
+from .book import Book
+
+# NumPy is optional (only the columnar analytics need it) and slow to import,
+# so it is loaded the first time a table is asked for rather than at startup
+np = None
+_numpy_checked = False
+
+def load_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
+
+STATUS_CODES = {"To Be Read": 0, "Finished": 1, "Currently Reading": 2, "Did Not Finish": 3}
+
+# Ordinal used for dates that are set but not in "%Y-%m-%d" form
+UNPARSED_DATE = -1
+
+def numpy_available() -> bool:
+    return load_numpy() is not None
+
+def date_code(stored: Union[int, str]) -> int:
+    """Sortable ordinal of a stored date; dates that aren't "%Y-%m-%d" sort before every real one"""
+    # Book already keeps ISO dates as ordinals; anything still a string didn't parse
+    return stored if isinstance(stored, int) else UNPARSED_DATE
+
+class BookTable:
+    """Columnar NumPy view of a book list for vectorized analytics"""
+
+    def __init__(self, books: List[Book]):
+        if load_numpy() is None:
+            raise ImportError("BookTable requires NumPy (pip install numpy)")
+
+        self.books = list(books)
+        count = len(self.books)
+        status_codes = dict(STATUS_CODES)
+
+        self.rating = np.fromiter((b.rating for b in self.books), dtype=np.int8, count=count)
+        self.total_pages = np.fromiter((b.total_pages for b in self.books), dtype=np.int32, count=count)
+        self.pages_read = np.fromiter((b.pages_read for b in self.books), dtype=np.int32, count=count)
+        self.reading_time_minutes = np.fromiter(
+            (b.reading_time_minutes for b in self.books), dtype=np.int64, count=count)
+        self.status = np.fromiter(
+            (status_codes.setdefault(b.status, len(status_codes)) for b in self.books), dtype=np.int16, count=count)
+        self.status_names = list(status_codes)
+        self.date_started = np.fromiter((date_code(b._date_started) for b in self.books), dtype=np.int32, count=count)
+        self.date_finished = np.fromiter((date_code(b._date_finished) for b in self.books), dtype=np.int32, count=count)
+        self.currently_reading = np.fromiter(
+            (b.is_currently_reading() for b in self.books), dtype=bool, count=count)
+
+        # Sparse genre membership in CSR form: book i owns genre_ids[genre_indptr[i]:genre_indptr[i + 1]]
+        genre_codes: Dict[str, int] = {}
+        genre_ids = []
+        genre_indptr = np.zeros(count + 1, dtype=np.int64)
+        for i, book in enumerate(self.books):
+            for genre in book.genre:
+                genre_ids.append(genre_codes.setdefault(genre, len(genre_codes)))
+            genre_indptr[i + 1] = len(genre_ids)
+        self.genre_names = list(genre_codes)
+        self.genre_ids = np.array(genre_ids, dtype=np.int32)
+        self.genre_indptr = genre_indptr
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def status_code(self, status: str) -> int:
+        return self.status_names.index(status) if status in self.status_names else -1
+
+    def status_count(self, status: str) -> int:
+        return int(np.count_nonzero(self.status == self.status_code(status)))
+
+    def genre_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.genre_ids, minlength=len(self.genre_names))
+        return {name: int(count) for name, count in zip(self.genre_names, counts) if count}
+
+    def genre_membership(self, genre: str):
+        """Boolean mask of books tagged with this exact genre"""
+        if genre not in self.genre_names:
+            return np.zeros(len(self.books), dtype=bool)
+        hits = self.genre_ids == self.genre_names.index(genre)
+        # Map each hit back to its owning row through the CSR row pointers
+        rows = np.searchsorted(self.genre_indptr, np.nonzero(hits)[0], side='right') - 1
+        mask = np.zeros(len(self.books), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def statistics(self, dnf_count: int = 0) -> Dict:
+        """Vectorized equivalent of compute_statistics"""
+        rated = self.rating > 0
+        rated_count = int(np.count_nonzero(rated))
+        return {
+            'total_books': len(self.books) + dnf_count,
+            'finished_books': self.status_count("Finished"),
+            'currently_reading': int(np.count_nonzero(self.currently_reading)),
+            'to_be_read': self.status_count("To Be Read"),
+            'dnf_books': dnf_count,
+            'total_pages_read': int(self.pages_read[self.pages_read > 0].sum(dtype=np.int64)),
+            'total_reading_time_hours': int(self.reading_time_minutes.sum()) / 60,
+            'genre_counts': self.genre_counts(),
+            'average_rating': int(self.rating[rated].sum(dtype=np.int64)) / rated_count if rated_count else 0,
+            'rated_books_count': rated_count
+        }
+
+    def completion_rate(self, dnf_count: int = 0) -> float:
+        total = len(self.books) + dnf_count
+        return self.status_count("Finished") / total * 100 if total else 0.0
+
+    def recent_finishes(self, limit: int = 10) -> List[Book]:
+        """Finished books with a finish date, most recent first"""
+        rows = np.nonzero((self.status == self.status_code("Finished")) & (self.date_finished != 0))[0]
+        # Stable sort keeps library order for books finished on the same day
+        order = rows[np.argsort(-self.date_finished[rows].astype(np.int64), kind='stable')]
+        return [self.books[i] for i in order[:limit]]
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+from .book import Book
+from .sqlite_store import StoreWriteError
+from utils.atomic_write import atomic_write
+from utils.book_metadata import clean_isbn
+
+# Genre lists that carry no information and may be replaced by looked-up subjects
+PLACEHOLDER_GENRES = ([], [''], ['Unknown'])
+
+def missing_genres(book: Book) -> bool:
+    return book.genre in PLACEHOLDER_GENRES
+
+def needs_enrichment(book: Book) -> bool:
+    """Has an ISBN but is missing a cover, a page count or real genres"""
+    return bool(clean_isbn(book.isbn)) and (not book.cover_url or book.total_pages <= 0 or missing_genres(book))
+
+def apply_metadata(book: Book, data: Dict) -> bool:
+    """Fill in only the fields the book is missing; returns True if anything changed"""
+    changed = False
+    if not book.cover_url and data.get('cover_url'):
+        book.cover_url = data['cover_url']
+        changed = True
+    if book.total_pages <= 0 and data.get('pages'):
+        book.total_pages = int(data['pages'])
+        changed = True
+    genres = [genre for genre in data.get('genres') or [] if genre and genre != 'Unknown']
+    if genres and missing_genres(book):
+        book.genre = [sys.intern(genre) for genre in genres]
+        changed = True
+    return changed
+
+class EnrichmentJob:
+    """Looks up metadata for every book in a library that is missing some, in bulk.
+
+    ISBNs are deduplicated and fetched `chunk_size` at a time through an
+    AsyncBookAPI (which batches and parallelizes each chunk). Hits are
+    checkpointed after every chunk, so an interrupted or cancelled job resumes
+    where it left off; the books are only changed, and saved once, when every
+    chunk has been fetched. Runs on a worker thread; if the library's database
+    write fails the summary carries the error under 'save_error'.
+    """
+
+    def __init__(self, library, client, chunk_size: int = 200,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.library = library
+        self.client = client
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.checkpoint_file = library.csv_file.replace('.csv', '_enrichment.json')
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop after the chunk in flight; the checkpoint keeps what was fetched"""
+        self.cancelled.set()
+
+    def collect(self) -> Dict[str, List[Book]]:
+        """Books that need metadata, grouped by cleaned ISBN"""
+        groups: Dict[str, List[Book]] = {}
+        with self.library.lock:
+            for book in self.library.books:
+                if needs_enrichment(book):
+                    groups.setdefault(clean_isbn(book.isbn), []).append(book)
+        return groups
+
+    def load_checkpoint(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as file:
+                return json.load(file).get('results', {})
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable enrichment checkpoint: {e}")
+            return {}
+
+    def save_checkpoint(self, results: Dict[str, Dict]):
+        try:
+            with atomic_write(self.checkpoint_file, fsync=False) as file:
+                json.dump({'results': results}, file, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️ Error saving enrichment checkpoint: {e}")
+
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def run(self) -> Dict:
+        """Fetch, then apply everything in one batch; returns a summary of what happened"""
+        groups = self.collect()
+        # Only hits are checkpointed; misses may have been outages, so they are retried
+        results = {isbn: data for isbn, data in self.load_checkpoint().items() if isbn in groups}
+        todo = [isbn for isbn in groups if isbn not in results]
+        summary = {'books': sum(len(books) for books in groups.values()), 'isbns': len(groups),
+                   'resumed': len(results), 'fetched': 0, 'updated': 0, 'complete': False, 'save_error': None}
+
+        done = len(results)
+        self._report(done, len(groups))
+        for start in range(0, len(todo), self.chunk_size):
+            if self.cancelled.is_set():
+                return summary
+            chunk = todo[start:start + self.chunk_size]
+            for isbn, data in self.client.lookup_many_sync(chunk).items():
+                if data:
+                    results[isbn] = data
+                    summary['fetched'] += 1
+            done += len(chunk)
+            self.save_checkpoint(results)
+            self._report(done, len(groups))
+
+        with self.library.lock:
+            changed = [book for isbn, data in results.items() for book in groups[isbn] if apply_metadata(book, data)]
+            try:
+                summary['updated'] = self.library.update_books(changed)
+            except StoreWriteError as e:
+                # The books are updated and a full save is queued; only the rows lag behind
+                summary['updated'] = len(changed)
+                summary['save_error'] = str(e)
+        summary['complete'] = True
+        self.clear_checkpoint()
+        return summary
+
+    def _report(self, done: int, total: int):
+        if self.progress:
+            try:
+                self.progress(done, total)
+            except Exception as e:
+                print(f"⚠️ Error reporting enrichment progress: {e}")
@@ -0,0 +1,192 @@
+import csv
+from typing import Dict, Iterator, List, Optional, Tuple
+from .book import Book
+from .library_index import normalize_isbn
+
+# Canonical field -> the headers it appears under (the library CSV first, then our CSV export)
+COLUMN_ALIASES = {
+    'title': ("Book Name:", "Title"),
+    'author': ("Author",),
+    'genre': ("Genre - Theme - Type", "Genres"),
+    'status': ("Status:", "Status"),
+    'rating': ("Rating",),
+    'review': ("Review",),
+    'total_pages': ("Total Pages",),
+    'pages_read': ("Pages Read",),
+    'date_started': ("Date Started",),
+    'date_finished': ("Date Finished",),
+    'reading_time': ("Reading Time", "Reading Time (hours)"),
+    'isbn': ("ISBN",),
+    'cover_url': ("Cover URL",),
+}
+
+# (line number, message) for every row that was skipped
+RowErrors = List[Tuple[int, str]]
+
+def normalize_header(header: str) -> str:
+    return header.strip().rstrip(':').strip().casefold()
+
+def title_author_key(book: Book) -> Tuple[str, str]:
+    """Title and author with case and whitespace differences ignored, for duplicate detection"""
+    return ' '.join(book.title.casefold().split()), ' '.join(book.author.casefold().split())
+
+def parse_int(value: str, field: str) -> int:
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            raise ValueError(f"{field} {value!r} is not a number") from None
+
+def parse_rating(value: str) -> int:
+    if not value or value.casefold() in ('not rated', 'no rating'):
+        return 0
+    if not value.strip('★☆'):
+        return value.count('★')
+    rating = parse_int(value, 'rating')
+    if not 0 <= rating <= 5:
+        raise ValueError(f"rating {rating} is not between 0 and 5")
+    return rating
+
+def sniff_dialect(sample: str):
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        return csv.excel
+
+class ColumnMap:
+    """Positions of the known fields in a CSV header, worked out once per file"""
+
+    def __init__(self, header: List[str]):
+        aliases = {normalize_header(alias): field for field, names in COLUMN_ALIASES.items() for alias in names}
+        self.positions: Dict[str, int] = {}
+        self.names: Dict[str, str] = {}
+        for position, name in enumerate(header):
+            field = aliases.get(normalize_header(name))
+            if field and field not in self.positions:
+                self.positions[field] = position
+                self.names[field] = name.strip()
+        if 'title' not in self.positions:
+            raise ValueError(f"no title column in CSV header: {', '.join(header)}")
+        # Our own CSV export joins genres with bullets and gives reading time in hours
+        self.export_format = self.names.get('genre') == "Genres"
+        self.reading_time_hours = self.names.get('reading_time') == "Reading Time (hours)"
+
+    def book(self, row: List[str], status: Optional[str] = None) -> Book:
+        """Build a Book from one row, raising ValueError if a value can't be used"""
+        def value(field: str, strip: bool = True) -> str:
+            position = self.positions.get(field)
+            if position is None or position >= len(row):
+                return ""
+            return row[position].strip() if strip else row[position]
+
+        title = value('title')
+        if not title:
+            raise ValueError("missing title")
+
+        genre = value('genre')
+        if self.export_format:
+            genres = genre.split(' • ') if genre else ['Unknown']
+        else:
+            genres = genre.split(" - ")
+
+        if self.reading_time_hours:
+            hours = value('reading_time')
+            try:
+                reading_time_minutes = int(float(hours) * 60) if hours else 0
+            except ValueError:
+                raise ValueError(f"reading time {hours!r} is not a number") from None
+        else:
+            reading_time_minutes = parse_int(value('reading_time'), 'reading time')
+
+        return Book(
+            title=title,
+            author=value('author'),
+            genre=genres,
+            status=status or value('status') or "To Be Read",
+            rating=parse_rating(value('rating')),
+            review=value('review', strip=False),
+            total_pages=parse_int(value('total_pages'), 'total pages'),
+            pages_read=parse_int(value('pages_read'), 'pages read'),
+            date_started=value('date_started'),
+            date_finished=value('date_finished'),
+            reading_time_minutes=reading_time_minutes,
+            isbn=value('isbn'),
+            cover_url=value('cover_url'),
+        )
+
+def read_csv_books(filename: str, errors: RowErrors, status: str = None) -> Iterator[Book]:
+    """Stream Books from a library or export CSV, appending bad rows to `errors` instead of failing"""
+    with open(filename, newline="", encoding="utf-8-sig") as file:
+        dialect = sniff_dialect(file.read(4096))
+        file.seek(0)
+        reader = csv.reader(file, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = ColumnMap(header)
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                book = columns.book(row, status)
+            except ValueError as e:
+                errors.append((reader.line_num, str(e)))
+                continue
+            yield book
+
+class CsvImporter:
+    """Imports a CSV into a library in chunks, skipping rows that duplicate an existing book.
+
+    A book is a duplicate if its ISBN or its title and author (ignoring case
+    and spacing) match a book already in the library or earlier in the file.
+    The library is locked for the whole import and saved once at the end.
+    """
+
+    def __init__(self, library, chunk_size: int = 500):
+        self.library = library
+        self.chunk_size = chunk_size
+
+    def run(self, filename: str) -> Dict:
+        errors: RowErrors = []
+        summary = {'rows': 0, 'imported': 0, 'duplicates': 0, 'errors': errors}
+        library = self.library
+
+        with library.lock:
+            seen_isbns = {normalize_isbn(book.isbn) for book in library.books if book.isbn}
+            seen_titles = {title_author_key(book) for book in library.books}
+            chunk = []
+            try:
+                for book in read_csv_books(filename, errors):
+                    summary['rows'] += 1
+                    isbn = normalize_isbn(book.isbn)
+                    key = title_author_key(book)
+                    if (isbn and isbn in seen_isbns) or key in seen_titles:
+                        summary['duplicates'] += 1
+                        continue
+                    if isbn:
+                        seen_isbns.add(isbn)
+                    seen_titles.add(key)
+                    chunk.append(book)
+                    if len(chunk) >= self.chunk_size:
+                        summary['imported'] += library.add_books(chunk)
+                        chunk = []
+            except Exception as e:
+                print(f"⚠️ Error importing {filename}: {e}")
+                errors.append((0, str(e)))
+            finally:
+                # Whatever made it in is kept, and written with a single save
+                if chunk:
+                    summary['imported'] += library.add_books(chunk)
+                if summary['imported']:
+                    library.save_batch()
+
+        summary['rows'] += sum(1 for line, _ in errors if line)
+        return summary
+
+def import_books(library, filename: str) -> Dict:
+    """Import a CSV into `library`; returns counts of rows, imported books, duplicates and row errors"""
+    return CsvImporter(library).run(filename)
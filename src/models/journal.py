@@ -0,0 +1,113 @@
+import os
+import json
+from typing import List
+from .book import Book
+
+class BookJournal:
+    """Append-only log of library mutations, replayed on top of the last saved snapshot.
+
+    Every record carries a sequence number that keeps growing across compactions.
+    Snapshots store the last one they contain, so records that a snapshot already
+    holds are skipped even if a crash kept the journal from being cleared.
+    """
+
+    def __init__(self, journal_file: str, compact_threshold: int = 500):
+        self.journal_file = journal_file
+        self.compact_threshold = compact_threshold
+        self.record_count = 0
+        self.sequence = 0
+        self.pending: List[str] = []
+
+    def append(self, op: str, index: int = None, book: Book = None):
+        """Queue a single add/remove/update record; flush() writes it to the journal file"""
+        self.sequence += 1
+        record = {'op': op, 'seq': self.sequence}
+        if index is not None:
+            record['index'] = index
+        if book is not None:
+            record['book'] = book.to_dict()
+        self.pending.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self.record_count += 1
+
+    def flush(self):
+        """Append every queued record to the journal file in one write"""
+        if not self.pending:
+            return
+        try:
+            with open(self.journal_file, 'a', encoding='utf-8') as file:
+                file.write(''.join(self.pending))
+            self.pending = []
+        except Exception as e:
+            print(f"⚠️ Error writing to journal: {e}")
+
+    def replay(self, books: List[Book], snapshot_sequence: int = 0) -> List[Book]:
+        """Apply the journaled records newer than the snapshot to its books, in order"""
+        self.record_count = 0
+        self.sequence = snapshot_sequence
+        self.pending = []
+        if not os.path.exists(self.journal_file):
+            return books
+
+        try:
+            self._truncate_torn_record()
+            with open(self.journal_file, 'r', encoding='utf-8') as file:
+                for line_number, line in enumerate(file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        print(f"⚠️ Skipping unreadable journal record at line {line_number}")
+                        continue
+                    self.record_count += 1
+                    # Records from before sequence numbers have none and always apply
+                    sequence = record.get('seq')
+                    if sequence is not None:
+                        if sequence <= snapshot_sequence:
+                            continue
+                        self.sequence = max(self.sequence, sequence)
+                    self._apply(books, record)
+        except Exception as e:
+            print(f"⚠️ Error replaying journal: {e}")
+
+        return books
+
+    def _truncate_torn_record(self):
+        """Cut a crash mid-append back to the last complete line, so the next append starts on its own line"""
+        with open(self.journal_file, 'r+b') as file:
+            data = file.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                print(f"⚠️ Dropping a torn record at the end of {self.journal_file}")
+                file.truncate(complete)
+
+    def _apply(self, books: List[Book], record: dict):
+        op = record.get('op')
+        index = record.get('index')
+
+        if op == 'add':
+            books.append(Book.from_dict(record.get('book', {})))
+        elif op in ('remove', 'update') and (index is None or not 0 <= index < len(books)):
+            print(f"⚠️ Journal record '{op}' points at missing book #{index}")
+        elif op == 'remove':
+            del books[index]
+        elif op == 'update':
+            books[index] = Book.from_dict(record.get('book', {}))
+        else:
+            print(f"⚠️ Unknown journal operation: {op}")
+
+    def needs_compaction(self) -> bool:
+        return self.record_count >= self.compact_threshold
+
+    def clear(self):
+        """Drop all records once they are folded into a fresh snapshot (the sequence keeps counting)"""
+        try:
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self.record_count = 0
+            self.pending = []
+        except Exception as e:
+            print(f"⚠️ Error clearing journal: {e}")
+
+    def __len__(self) -> int:
+        return self.record_count
@@ -2,78 +2,152 @@ import os
 import csv
 import json
 import random
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 from .book import Book
+from .journal import BookJournal
+from .sqlite_store import SQLiteBookStore, StoreWriteError
+from .search_index import SearchIndex
+from .library_index import LibraryIndex
+from .statistics import ReadingStatistics
+from .book_table import BookTable, numpy_available, date_code
+from .query_cache import QueryCache
+from .importer import read_csv_books
+from .binary_snapshot import write_snapshot, load_snapshot_with_recovery, remap_books
+from utils.atomic_write import atomic_write, load_json_with_recovery
+from utils.instrumentation import timed, count
+
+# Previous snapshot generations kept next to each library's JSON file
+SNAPSHOT_BACKUPS = 2
+# Storage backends that keep the snapshot in the .rwb format; "mapped" reads it lazily
+BINARY_STORAGES = ("binary", "mapped")
 
 class Library:
-    def __init__(self, name: str, csv_file: str, dnf_csv_file: str = None):
+    def __init__(self, name: str, csv_file: str, dnf_csv_file: str = None, storage: str = "json",
+                 dnf_books: List[Book] = None, persistence=None):
         self.name = name
+        self.storage = storage
+        # Optional PersistenceScheduler; without one every save runs immediately
+        self.persistence = persistence
+        # Held while mutating or snapshotting so background saves see a consistent library
+        self.lock = threading.RLock()
         self.csv_file = csv_file
         self.dnf_csv_file = dnf_csv_file
         self.json_file = csv_file.replace('.csv', '_extended.json')
         self.dnf_json_file = dnf_csv_file.replace('.csv', '_extended.json') if dnf_csv_file else None
+        self.journal_file = csv_file.replace('.csv', '_journal.jsonl')
+        self.journal = BookJournal(self.journal_file)
+        self.db_file = csv_file.replace('.csv', '.db')
+        # Snapshot file of the "binary" and "mapped" storage backends (JSON stays available for export)
+        self.binary_file = csv_file.replace('.csv', '.rwb')
+        self.store = SQLiteBookStore(self.db_file) if storage == "sqlite" else None
+        # Set when a SQLite write failed; row positions no longer match until a full save succeeds
+        self.store_stale = False
         self.books = self.load_books()
-        self.dnf_books = self.load_dnf_books() if dnf_csv_file else []
+        # The DNF list is shared between libraries; a manager passes the one it already loaded
+        if dnf_books is not None:
+            self.dnf_books = dnf_books
+        else:
+            self.dnf_books = self.load_dnf_books() if dnf_csv_file else []
+        # Built on the first search, most sessions only browse
+        self.search_index = SearchIndex(self.books)
+        # Built on first use by get_index()/get_statistics(): building either reads every field
+        # of every book, which for a "mapped" library means decoding every record
+        self.index: Optional[LibraryIndex] = None
+        self.statistics: Optional[ReadingStatistics] = None
+        # Bumped on every mutation so derived views know when they are stale
+        self.version = 0
+        self._table = None
+        self.query_cache = QueryCache(self)
+
+    def rebuild_indexes(self):
+        """Re-index after self.books was replaced wholesale"""
+        self.version += 1
+        self.search_index.reset(self.books)
+        self.index = None
+        self.statistics = None
+        self.query_cache.clear()
 
+    @timed("library.load_books")
     def load_books(self) -> List[Book]:
+        """Load the last snapshot and replay any journaled changes on top of it"""
+        if self.store:
+            if self.store.is_migrated():
+                return self.store.load_books()
+            # One-time migration from the JSON/CSV files into SQLite
+            books = self.replay_journal(self.load_snapshot())
+            try:
+                self.store.replace_all(books)
+            except StoreWriteError as e:
+                # The JSON/CSV files stay the source of truth; the next change retries the migration
+                print(f"⚠️ {e}")
+                self.store_stale = True
+            return books
+
+        books = self.replay_journal(self.load_snapshot())
+
+        # Fold a long journal into a fresh snapshot so the next start is cheap; a binary
+        # library that was read from its JSON files is converted right away too
+        converting = self.storage in BINARY_STORAGES and self.snapshot_source not in (None, self.binary_file)
+        if self.journal.needs_compaction() or converting:
+            self.books = books
+            self.save_books()
+
+        return books
+
+    def replay_journal(self, books: List[Book]) -> List[Book]:
+        # A binary library's journal follows its .rwb file once there is one, never an older JSON snapshot
+        primary = self.binary_file if self.storage in BINARY_STORAGES and os.path.exists(self.binary_file) else self.json_file
+        if self.snapshot_source not in (None, primary):
+            # Journal positions refer to the newest snapshot, not the backup we fell back to
+            orphaned_file = f"{self.journal_file}.orphaned"
+            if os.path.exists(self.journal_file):
+                print(f"⚠️ Loaded an older snapshot; journal kept aside as {orphaned_file}")
+                os.replace(self.journal_file, orphaned_file)
+            return books
+        return self.journal.replay(books, self.snapshot_sequence)
+
+    @timed("library.load_snapshot")
+    def load_snapshot(self) -> List[Book]:
         books = []
+        self.snapshot_source = None
+        # Last journal record already folded into the snapshot
+        self.snapshot_sequence = 0
         
-        # Try to load from extended JSON first (has all new features)
-        if os.path.exists(self.json_file):
+        if self.storage in BINARY_STORAGES:
+            # "mapped" leaves the records in the memory-mapped file until each book is read
+            binary_books, self.snapshot_sequence, self.snapshot_source = load_snapshot_with_recovery(
+                self.binary_file, SNAPSHOT_BACKUPS, lazy=self.storage == "mapped")
+            if binary_books is not None:
+                return binary_books
+        
+        # Try to load from extended JSON first (has all new features),
+        # falling back to the newest backup generation that still parses
+        data, self.snapshot_source = load_json_with_recovery(self.json_file, SNAPSHOT_BACKUPS)
+        if data is not None:
             try:
-                with open(self.json_file, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    for book_data in data.get('books', []):
-                        books.append(Book.from_dict(book_data))
+                for book_data in data.get('books', []):
+                    books.append(Book.from_dict(book_data))
+                self.snapshot_sequence = data.get('journal_seq', 0)
                 return books
             except Exception as e:
                 print(f"⚠️ Error loading JSON file: {e}")
+                books = []
+                self.snapshot_source = None
         
         # Fallback to CSV (legacy format)
         if os.path.exists(self.csv_file):
+            errors = []
             try:
-                with open(self.csv_file, newline="", encoding="utf-8") as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        # Create book with legacy CSV format
-                        book = Book(
-                            title=row.get("Book Name:", "").strip(),
-                            author=row.get("Author", "").strip(),
-                            genre=row.get("Genre - Theme - Type", "").strip().split(" - "),
-                            status=row.get("Status:", "To Be Read").strip(),
-                            rating=int(row.get("Rating", 0)),
-                            review=row.get("Review", ""),
-                            total_pages=int(row.get("Total Pages", 0)),
-                            pages_read=int(row.get("Pages Read", 0)),
-                            date_started=row.get("Date Started", ""),
-                            date_finished=row.get("Date Finished", ""),
-                            reading_time_minutes=int(row.get("Reading Time", 0)),
-                            isbn=row.get("ISBN", ""),
-                            cover_url=row.get("Cover URL", "")
-                        )
-                        books.append(book)
+                books = list(read_csv_books(self.csv_file, errors))
+                for line, message in errors:
+                    print(f"⚠️ Skipping line {line} of {self.csv_file}: {message}")
                         
-                # Save to new JSON format
+                # Save to new JSON (or binary) format
                 self.books = books
-                self.save_books_to_json()
+                self.save_snapshot()
                         
-            except KeyError as k:
-                print(f"⚠️ Key error: {k} in CSV file. Using basic format.")
-                # Try basic CSV format
-                try:
-                    with open(self.csv_file, newline="", encoding="utf-8") as file:
-                        reader = csv.DictReader(file)
-                        for row in reader:
-                            book = Book(
-                                title=row["Book Name:"].strip(),
-                                author=row["Author"].strip(),
-                                genre=row["Genre - Theme - Type"].strip().split(" - "),
-                                status=row["Status:"].strip(),
-                            )
-                            books.append(book)
-                except Exception as e:
-                    print(f"⚠️ Warning: {e}")
             except Exception as e:
                 print(f"⚠️ Warning: {e}")
         
@@ -84,52 +158,65 @@ class Library:
 
     def load_dnf_books(self) -> List[Book]:
         """Load books from DNF CSV file"""
+        return self.read_dnf_csv(self.dnf_csv_file)
+
+    @staticmethod
+    def read_dnf_csv(dnf_csv_file: str) -> List[Book]:
         books = []
         
-        if not self.dnf_csv_file or not os.path.exists(self.dnf_csv_file):
+        if not dnf_csv_file or not os.path.exists(dnf_csv_file):
             return books
             
+        errors = []
         try:
-            with open(self.dnf_csv_file, newline="", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    book = Book(
-                        title=row.get("Book Name:", "").strip(),
-                        author=row.get("Author", "").strip(),
-                        genre=row.get("Genre - Theme - Type", "").strip().split(" - "),
-                        status="Did Not Finish",  # Always DNF for this library
-                        rating=int(row.get("Rating", 0)),
-                        review=row.get("Review", ""),
-                        total_pages=int(row.get("Total Pages", 0)),
-                        pages_read=int(row.get("Pages Read", 0)),
-                        date_started=row.get("Date Started", ""),
-                        date_finished=row.get("Date Finished", ""),
-                        reading_time_minutes=int(row.get("Reading Time", 0)),
-                        isbn=row.get("ISBN", ""),
-                        cover_url=row.get("Cover URL", "")
-                    )
-                    books.append(book)
+            # Always DNF for this library
+            books = list(read_csv_books(dnf_csv_file, errors, status="Did Not Finish"))
         except Exception as e:
             print(f"⚠️ Error loading DNF books: {e}")
+        for line, message in errors:
+            print(f"⚠️ Skipping line {line} of {dnf_csv_file}: {message}")
             
         return books
 
+    @timed("library.save_books_to_json")
     def save_books_to_json(self):
         try:
             data = {
                 'library_name': self.name,
                 'last_updated': datetime.now().isoformat(),
+                'journal_seq': self.journal.sequence,
                 'books': [book.to_dict() for book in self.books]
             }
-            with open(self.json_file, 'w', encoding='utf-8') as file:
+            with atomic_write(self.json_file, backups=SNAPSHOT_BACKUPS) as file:
                 json.dump(data, file, indent=2, ensure_ascii=False)
+            return True
         except Exception as e:
             print(f"⚠️ Error saving books to JSON: {e}")
+            return False
+
+    @timed("library.save_books_to_binary")
+    def save_books_to_binary(self):
+        try:
+            write_snapshot(self.binary_file, self.name, self.books, backups=SNAPSHOT_BACKUPS,
+                           journal_sequence=self.journal.sequence)
+            if self.storage == "mapped":
+                remap_books(self.books, self.binary_file)
+            return True
+        except Exception as e:
+            print(f"⚠️ Error saving books to binary snapshot: {e}")
+            return False
+
+    def save_snapshot(self) -> bool:
+        """Write the full book list in this library's snapshot format"""
+        if self.storage in BINARY_STORAGES:
+            return self.save_books_to_binary()
+        return self.save_books_to_json()
 
+    @timed("library.save_books_to_csv")
     def save_books_to_csv(self):
         # Keep CSV for backward compatibility
         try:
-            with open(self.csv_file, "w", newline="", encoding="utf-8") as file:
+            with atomic_write(self.csv_file, newline="") as file:
                 fieldnames = [
                     "Book Name:", "Author", "Genre - Theme - Type", "Status:",
                     "Rating", "Review", "Total Pages", "Pages Read", 
@@ -156,39 +243,192 @@ class Library:
         except Exception as e:
             print(f"⚠️ Error saving books to CSV: {e}")
 
+    @timed("library.save_books")
     def save_books(self):
-        self.save_books_to_json()
-        self.save_books_to_csv()
+        """Write a full snapshot and compact the journal into it"""
+        with self.lock:
+            if self.store:
+                self.store.replace_all(self.books)
+                self.store_stale = False
+                return
+
+            if self.save_snapshot():
+                self.journal.clear()
+            self.save_books_to_csv()
+
+    @timed("library.flush_journal")
+    def flush_journal(self):
+        with self.lock:
+            self.journal.flush()
+
+    def save_dnf(self):
+        """Write the shared DNF list to its CSV and JSON files"""
+        with self.lock:
+            self.save_dnf_books()
+            self.save_dnf_books_to_json()
+
+    def schedule_save(self, key: str, save):
+        """Hand a write to the persistence scheduler, or run it now if there is none"""
+        if self.persistence:
+            self.persistence.mark_dirty(key, save)
+        else:
+            save()
+
+    def write_store(self, write, *args):
+        """Run a SQLite write (callers hold self.lock); if it fails, queue a full save that
+        rewrites every row and raise StoreWriteError unless that save already went through"""
+        if self.store_stale:
+            # Positions are off since an earlier failure; only the full save can catch up
+            self.schedule_save(f"{self.json_file}:snapshot", self.save_books)
+            return
+        try:
+            write(*args)
+        except StoreWriteError:
+            self.store_stale = True
+            try:
+                self.schedule_save(f"{self.json_file}:snapshot", self.save_books)
+            except StoreWriteError:
+                pass
+            if self.store_stale:
+                raise
+
+    def reindex(self, book: Book, removed: bool = False):
+        """Bring the indexes and statistics up to date for one changed book (callers hold self.lock);
+        the ones not built yet will read the book when they are"""
+        if removed:
+            self.search_index.remove(book)
+            if self.index is not None:
+                self.index.remove(book)
+            if self.statistics is not None:
+                self.statistics.remove(book)
+        else:
+            self.search_index.update(book)
+            if self.index is not None:
+                self.index.update(book)
+            if self.statistics is not None:
+                self.statistics.update(book)
+
+    def record_change(self, op: str, index: int = None, book: Book = None):
+        """Index and persist a single mutation (callers hold self.lock)"""
+        self.version += 1
+        count(f"library.{op}")
+        self.query_cache.invalidate(book)
+        self.reindex(book, removed=op == 'remove')
+        if op == 'remove':
+            # Removals are replayed by position, the journal doesn't need the book itself
+            book = None
+
+        if self.store:
+            self.write_store(self.store.apply, op, index, book)
+            return
+
+        # Compact once the journal grows too long
+        self.journal.append(op, index, book)
+        if self.journal.needs_compaction():
+            self.schedule_save(f"{self.json_file}:snapshot", self.save_books)
+        else:
+            self.schedule_save(f"{self.journal_file}:journal", self.flush_journal)
 
     def add_book(self, book: Book):
-        self.books.append(book)
-        self.save_books()
+        with self.lock:
+            self.books.append(book)
+            self.record_change('add', book=book)
 
     def remove_book(self, title: str) -> bool:
-        for book in self.books:
-            if book.title.lower() == title.lower():
-                self.books.remove(book)
-                self.save_books()
-                return True
-        return False
+        book = self.get_index().by_title(title)
+        return self.discard_book(book) if book else False
+
+    def position_of(self, book: Book) -> int:
+        """Position of this exact book instance in self.books, or -1"""
+        if self.index is not None and id(book) not in self.index.books:
+            return -1
+        # Book has no __eq__, so list.index compares by identity (and reads no fields)
+        try:
+            return self.books.index(book)
+        except ValueError:
+            return -1
+
+    def discard_book(self, book: Book) -> bool:
+        """Remove a specific book instance from the library"""
+        with self.lock:
+            index = self.position_of(book)
+            if index < 0:
+                return False
+            del self.books[index]
+            self.record_change('remove', index, book)
+            return True
 
     def update_book(self, book: Book):
-        self.save_books()
+        with self.lock:
+            index = self.position_of(book)
+            if index >= 0:
+                self.record_change('update', index, book)
+                return
+
+        # Books edited from the DNF view live in the DNF files instead
+        if book in self.dnf_books:
+            self.schedule_save(f"{self.dnf_csv_file}:dnf", self.save_dnf)
+        else:
+            self.schedule_save(f"{self.json_file}:snapshot", self.save_books)
+
+    def add_books(self, books: List[Book]) -> int:
+        """Append and index a batch of books without journaling them; call save_batch() once done"""
+        with self.lock:
+            self.version += 1
+            self.books.extend(books)
+            for book in books:
+                self.query_cache.invalidate(book)
+                self.reindex(book)
+            if self.store:
+                # Each batch is its own transaction; the SQLite rows are the save
+                self.write_store(self.store.add_many, books)
+            return len(books)
+
+    def save_batch(self):
+        """Persist everything added with add_books() in one write"""
+        with self.lock:
+            if self.store:
+                return
+            # Written now rather than queued: journal records made after the batch
+            # count positions in the new book list, which the old snapshot doesn't have
+            self.save_books()
+
+    def update_books(self, books: List[Book]) -> int:
+        """Re-index a batch of edited books and persist them with a single write"""
+        with self.lock:
+            positions = {id(book): index for index, book in enumerate(self.books)}
+            updates = [(positions[id(book)], book) for book in books if id(book) in positions]
+            if not updates:
+                return 0
+            self.version += 1
+            for _, book in updates:
+                self.query_cache.invalidate(book)
+                self.reindex(book)
+            if self.store:
+                self.write_store(self.store.update_many, updates)
+                return len(updates)
+
+        # One snapshot instead of a journal record per book
+        self.schedule_save(f"{self.json_file}:snapshot", self.save_books)
+        return len(updates)
 
     def move_to_dnf(self, book: Book):
         """Move a book from main library to DNF library"""
-        if book in self.books:
-            # Remove from main library
-            self.books.remove(book)
-            
-            # Set status to DNF and add to DNF library
-            book.status = "Did Not Finish"
-            self.dnf_books.append(book)
-            
-            # Save both libraries
-            self.save_books()
-            self.save_dnf_books()
-            self.save_dnf_books_to_json()
+        removed = False
+        try:
+            removed = self.discard_book(book)
+        except StoreWriteError:
+            # Out of the list already, only its database row is behind; finish the move
+            removed = True
+            raise
+        finally:
+            if removed:
+                # Set status to DNF and add to DNF library
+                book.status = "Did Not Finish"
+                self.dnf_books.append(book)
+                
+                # Save DNF library (main library change is journaled)
+                self.schedule_save(f"{self.dnf_csv_file}:dnf", self.save_dnf)
 
     def move_from_dnf(self, book: Book):
         """Move a book from DNF library back to main library"""
@@ -197,12 +437,11 @@ class Library:
             self.dnf_books.remove(book)
             
             # Add to main library (status should already be updated)
-            self.books.append(book)
-            
-            # Save both libraries
-            self.save_books()
-            self.save_dnf_books()
-            self.save_dnf_books_to_json()
+            try:
+                self.add_book(book)
+            finally:
+                # Save DNF library (main library change is journaled)
+                self.schedule_save(f"{self.dnf_csv_file}:dnf", self.save_dnf)
 
     def save_dnf_books(self):
         """Save DNF books to CSV file"""
@@ -210,7 +449,7 @@ class Library:
             return
             
         try:
-            with open(self.dnf_csv_file, "w", newline="", encoding="utf-8") as file:
+            with atomic_write(self.dnf_csv_file, newline="") as file:
                 fieldnames = [
                     "Book Name:", "Author", "Genre - Theme - Type", "Status:",
                     "Rating", "Review", "Total Pages", "Pages Read", 
@@ -249,79 +488,99 @@ class Library:
                 'last_updated': datetime.now().isoformat(),
                 'books': [book.to_dict() for book in self.dnf_books]
             }
-            with open(self.dnf_json_file, 'w', encoding='utf-8') as file:
+            with atomic_write(self.dnf_json_file) as file:
                 json.dump(data, file, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"⚠️ Error saving DNF books to JSON: {e}")
 
     def get_book_by_title(self, title: str) -> Optional[Book]:
-        for book in self.books:
-            if book.title.lower() == title.lower():
-                return book
-        return None
+        return self.get_index().by_title(title)
+
+    def get_book_by_isbn(self, isbn: str) -> Optional[Book]:
+        return self.get_index().by_isbn(isbn)
+
+    def get_books_by_author(self, author: str) -> List[Book]:
+        return self.get_index().by_author(author)
 
     def pick_random_book(self) -> str:
-        to_be_read_books = [book for book in self.books if book.status == "To Be Read"]
+        to_be_read_books = self.get_index().by_status("To Be Read")
         if to_be_read_books:
             return random.choice(to_be_read_books)
         else:
             return "📖 No books available!"
 
     def get_currently_reading(self) -> List[Book]:
-        return [book for book in self.books if book.is_currently_reading()]
+        return self.get_index().currently_reading()
 
     def get_books_by_status(self, status: str) -> List[Book]:
-        return [book for book in self.books if book.status == status]
+        return self.get_index().by_status(status)
 
     def get_books_by_rating(self, rating: int) -> List[Book]:
-        return [book for book in self.books if book.rating == rating]
+        return self.get_index().by_rating(rating)
 
     def get_reading_statistics(self) -> Dict:
-        total_books = len(self.books) + len(self.dnf_books)  # Include DNF books in total
-        finished_books = len([b for b in self.books if b.status == "Finished"])
-        currently_reading = len(self.get_currently_reading())
-        to_be_read = len([b for b in self.books if b.status == "To Be Read"])
-        dnf_books = len(self.dnf_books)  # Count from separate DNF list
-        
-        total_pages_read = sum(b.pages_read for b in self.books if b.pages_read > 0)
-        total_reading_time = sum(b.reading_time_minutes for b in self.books)
-        
-        # Genre statistics
-        genre_counts = {}
-        for book in self.books:
-            for genre in book.genre:
-                genre_counts[genre] = genre_counts.get(genre, 0) + 1
-        
-        # Rating statistics
-        rated_books = [b for b in self.books if b.rating > 0]
-        avg_rating = sum(b.rating for b in rated_books) / len(rated_books) if rated_books else 0
-        
-        return {
-            'total_books': total_books,
-            'finished_books': finished_books,
-            'currently_reading': currently_reading,
-            'to_be_read': to_be_read,
-            'dnf_books': dnf_books,
-            'total_pages_read': total_pages_read,
-            'total_reading_time_hours': total_reading_time / 60,
-            'genre_counts': genre_counts,
-            'average_rating': avg_rating,
-            'rated_books_count': len(rated_books)
-        }
-
-    def search_books(self, query: str) -> List[Book]:
-        query_lower = query.lower()
-        results = []
-        for book in self.books:
-            if (query_lower in book.title.lower() or 
-                query_lower in book.author.lower() or
-                any(query_lower in genre.lower() for genre in book.genre) or
-                query_lower in book.review.lower()):
-                results.append(book)
-        return results
+        return self.get_statistics().snapshot(len(self.dnf_books))
+
+    def get_index(self) -> LibraryIndex:
+        """The secondary indexes, built on first use"""
+        if self.index is None:
+            # Built under the lock so a concurrent mutation can't slip in half-way, and only
+            # published once complete
+            with self.lock:
+                if self.index is None:
+                    self.index = LibraryIndex(self.books)
+        return self.index
+
+    def get_statistics(self) -> ReadingStatistics:
+        """The running reading statistics, counted on first use"""
+        if self.statistics is None:
+            with self.lock:
+                if self.statistics is None:
+                    self.statistics = ReadingStatistics(self.books)
+        return self.statistics
+
+    def get_table(self) -> BookTable:
+        """Columnar view of the books for vectorized analytics (requires NumPy)"""
+        if self._table is None or self._table_version != self.version:
+            self._table = BookTable(self.books)
+            self._table_version = self.version
+        return self._table
+
+    def get_recent_finishes(self, limit: int = 10) -> List[Book]:
+        """Finished books with a finish date, most recent first"""
+        if numpy_available():
+            return self.get_table().recent_finishes(limit)
+        finished_books = [b for b in self.books if b.status == "Finished" and b.date_finished]
+        # Same key as the NumPy path, so the order doesn't depend on NumPy being installed
+        # (reverse=True keeps library order among equal keys, like its stable argsort)
+        finished_books.sort(key=lambda x: date_code(x._date_finished), reverse=True)
+        return finished_books[:limit]
+
+    def verify_statistics(self) -> bool:
+        """Check the running statistics against a full recompute"""
+        mismatched = self.get_statistics().verify(self.books, self.dnf_books)
+        if mismatched:
+            print(f"⚠️ Reading statistics out of sync: {', '.join(mismatched)}")
+        return not mismatched
+
+    @timed("library.search_books")
+    def search_books(self, query: str, include_review: bool = True, within: List[Book] = None) -> List[Book]:
+        """Search title, author, genres and (optionally) review, most relevant first"""
+        fields = ('title', 'author', 'genre', 'review') if include_review else ('title', 'author', 'genre')
+        if self.search_index.deferred_books is not None:
+            # Build under the lock so a concurrent mutation can't slip in half-way
+            with self.lock:
+                self.search_index.ensure_built()
+        return self.search_index.search(query, fields, within)
+
+    @timed("library.query_books")
+    def query_books(self, search: str = "", status: Optional[str] = None, rating: Optional[int] = None,
+                    sort_by: str = "Status") -> List[Book]:
+        """Books for the library view: searched, filtered and sorted, memoized per library version"""
+        return self.query_cache.query(search, status, rating, sort_by)
 
     def get_books_by_genre(self, genre: str) -> List[Book]:
-        return [book for book in self.books if any(genre.lower() in g.lower() for g in book.genre)]
+        return self.get_index().by_genre(genre)
 
     def list_books(self) -> str:
         return "\n".join(str(book) for book in self.books) if self.books else "No books in this library"
\ No newline at end of file
@@ -0,0 +1,133 @@
+from typing import Callable, List, Dict, Set, Iterable, Optional
+from .book import Book
+
+def normalize_isbn(isbn: str) -> str:
+    return isbn.replace('-', '').replace(' ', '').upper()
+
+# The values each index files a book under
+KEY_FUNCTIONS: Dict[str, Callable[[Book], list]] = {
+    'status': lambda book: [book.status],
+    'rating': lambda book: [book.rating],
+    'author': lambda book: [book.author.casefold()],
+    'title': lambda book: [book.title.casefold()],
+    'genre': lambda book: list(dict.fromkeys(genre.casefold() for genre in book.genre)),
+    'isbn': lambda book: [normalize_isbn(book.isbn)] if book.isbn else [],
+    'currently_reading': lambda book: [True] if book.is_currently_reading() else [],
+}
+
+class LibraryIndex:
+    """Secondary hash indexes over a library's books, keyed by book identity.
+
+    Nothing per book is kept beyond its bucket entries: removal derives the keys
+    from the book itself. A book edited in place before update()/remove() can
+    leave an entry in a bucket it no longer belongs to, so lookups check each
+    hit against the book's current value and prune the ones that don't match.
+    """
+
+    KEYS = tuple(KEY_FUNCTIONS)
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self.rebuild(books)
+
+    def rebuild(self, books: Iterable[Book]):
+        """Index a full book list from scratch, in library order"""
+        self.indexes: Dict[str, Dict[object, Set[int]]] = {key: {} for key in self.KEYS}
+        self.books: Dict[int, Book] = {}
+        self.sequence: Dict[int, int] = {}
+        self.next_sequence = 0
+        for book in books:
+            self.add(book)
+
+    @staticmethod
+    def index_keys(book: Book) -> Dict[str, list]:
+        return {name: key_function(book) for name, key_function in KEY_FUNCTIONS.items()}
+
+    def add(self, book: Book):
+        key = id(book)
+        if key in self.books:
+            self.remove(book)
+
+        for name, values in self.index_keys(book).items():
+            index = self.indexes[name]
+            for value in values:
+                index.setdefault(value, set()).add(key)
+        self.books[key] = book
+        self.sequence[key] = self.next_sequence
+        self.next_sequence += 1
+
+    def remove(self, book: Book):
+        key = id(book)
+        if key not in self.books:
+            return
+        for name, values in self.index_keys(book).items():
+            index = self.indexes[name]
+            for value in values:
+                bucket = index.get(value)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del index[value]
+        del self.books[key]
+        del self.sequence[key]
+
+    def update(self, book: Book):
+        """Re-index a book whose fields were edited in place, keeping its position"""
+        sequence = self.sequence.get(id(book))
+        self.add(book)
+        if sequence is not None:
+            self.sequence[id(book)] = sequence
+
+    def _ordered(self, keys: Iterable[int]) -> List[Book]:
+        return [self.books[key] for key in sorted(keys, key=self.sequence.__getitem__)]
+
+    def _bucket(self, name: str, value) -> Set[int]:
+        """Keys filed under `value` whose book still has it, dropping stale entries"""
+        index = self.indexes[name]
+        bucket = index.get(value)
+        if not bucket:
+            return set()
+        key_function = KEY_FUNCTIONS[name]
+        stale = [key for key in list(bucket) if key not in self.books or value not in key_function(self.books[key])]
+        if stale:
+            bucket.difference_update(stale)
+            if not bucket:
+                del index[value]
+        return bucket
+
+    def lookup(self, name: str, value) -> List[Book]:
+        """Books whose indexed value for `name` equals `value`, in library order"""
+        return self._ordered(self._bucket(name, value))
+
+    def count(self, name: str, value) -> int:
+        return len(self._bucket(name, value))
+
+    def by_status(self, status: str) -> List[Book]:
+        return self.lookup('status', status)
+
+    def by_rating(self, rating: int) -> List[Book]:
+        return self.lookup('rating', rating)
+
+    def by_author(self, author: str) -> List[Book]:
+        return self.lookup('author', author.casefold())
+
+    def by_title(self, title: str) -> Optional[Book]:
+        books = self.lookup('title', title.casefold())
+        return books[0] if books else None
+
+    def by_isbn(self, isbn: str) -> Optional[Book]:
+        books = self.lookup('isbn', normalize_isbn(isbn))
+        return books[0] if books else None
+
+    def by_genre(self, genre: str) -> List[Book]:
+        # Substring match over distinct genre names, then union their buckets
+        genre = genre.casefold()
+        keys = set()
+        for name in [name for name in self.indexes['genre'] if genre in name]:
+            keys |= self._bucket('genre', name)
+        return self._ordered(keys)
+
+    def currently_reading(self) -> List[Book]:
+        return self.lookup('currently_reading', True)
+
+    def __len__(self) -> int:
+        return len(self.books)
@@ -1,8 +1,16 @@
 import os
 import json
+import threading
 from typing import List, Dict, Optional
 from datetime import datetime
 from .library import Library
+from .persistence import PersistenceScheduler, DURABILITY_MODES
+from .sqlite_store import StoreWriteError
+from utils.atomic_write import atomic_write, load_json_with_recovery
+from utils.instrumentation import timer
+
+# Previous generations of libraries_config.json kept as .1 and .2
+CONFIG_BACKUPS = 2
 
 class LibraryManager:
     """Manages multiple user libraries with max 5 library limit"""
@@ -12,16 +20,19 @@ class LibraryManager:
         self.libraries_config_file = os.path.join(base_path, "libraries_config.json")
         self.dnf_csv_file = os.path.join(base_path, "dnf_books.csv")
         self.dnf_json_file = os.path.join(base_path, "dnf_books_extended.json")
+        self.manifest_file = os.path.join(base_path, "libraries_manifest.json")
         
         # Load or create libraries configuration
         self.libraries_config = self.load_libraries_config()
+        self.manifest = self.load_manifest()
+        self.persistence = PersistenceScheduler(self.libraries_config.get("durability", "debounced"))
         
-        # Initialize libraries
+        # Libraries are loaded on first access; only loaded ones live here. The lock
+        # makes a second caller wait for a load already running on another thread
         self.libraries = {}
-        self.current_library_id = None
-        self.dnf_books = []
-        
-        self.load_all_libraries()
+        self.load_lock = threading.RLock()
+        self.current_library_id = self.libraries_config.get("current_library", "main")
+        self.dnf_books = None
         
     def load_libraries_config(self) -> Dict:
         """Load libraries configuration from JSON file"""
@@ -40,12 +51,13 @@ class LibraryManager:
         }
         
         if os.path.exists(self.libraries_config_file):
-            try:
-                with open(self.libraries_config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️ Error loading libraries config: {e}")
+            config, source = load_json_with_recovery(self.libraries_config_file, CONFIG_BACKUPS)
+            if config is None:
+                print("⚠️ Error loading libraries config, using defaults")
                 return default_config
+            if source != self.libraries_config_file:
+                print(f"⚠️ Libraries config restored from {source}")
+            return config
         else:
             # Create default config
             self.save_libraries_config(default_config)
@@ -57,57 +69,115 @@ class LibraryManager:
             config = self.libraries_config
             
         try:
-            with open(self.libraries_config_file, 'w', encoding='utf-8') as f:
+            with atomic_write(self.libraries_config_file, backups=CONFIG_BACKUPS) as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"⚠️ Error saving libraries config: {e}")
     
-    def load_all_libraries(self):
-        """Load all libraries from configuration"""
+    def load_manifest(self) -> Dict:
+        """Load cached per-library metadata (book counts) used while libraries are unloaded"""
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading libraries manifest: {e}")
+        return {}
+    
+    def save_manifest(self):
+        """Refresh manifest entries for loaded libraries and write it if anything changed"""
+        changed = False
+        for lib_id, library in self.libraries.items():
+            entry = {"book_count": len(library.books), "signature": self.library_signature(lib_id)}
+            if self.manifest.get(lib_id) != entry:
+                self.manifest[lib_id] = entry
+                changed = True
+        if not changed:
+            return
+        try:
+            # The manifest is only a cache, so skip the fsync
+            with atomic_write(self.manifest_file, fsync=False) as f:
+                json.dump(self.manifest, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️ Error saving libraries manifest: {e}")
+    
+    def library_files(self, library_id: str) -> List[str]:
+        """Every file a library may be persisted in, whatever its storage backend"""
+        stem = os.path.join(self.base_path, f"books_{library_id}")
+        return [f"{stem}.csv", f"{stem}_extended.json", f"{stem}_journal.jsonl",
+                f"{stem}.db", f"{stem}.db-wal", f"{stem}.db-shm", f"{stem}.rwb", f"{stem}.rwb.1", f"{stem}.rwb.2",
+                f"{stem}_extended.json.1", f"{stem}_extended.json.2", f"{stem}_journal.jsonl.orphaned"]
+    
+    def library_signature(self, library_id: str) -> List:
+        """Size and mtime of a library's files, used to validate manifest entries"""
+        signature = []
+        for path in self.library_files(library_id):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return signature
+    
+    def get_library_config(self, library_id: str) -> Optional[Dict]:
         for lib_config in self.libraries_config["libraries"]:
-            lib_id = lib_config["id"]
-            lib_name = lib_config["name"]
+            if lib_config["id"] == library_id:
+                return lib_config
+        return None
+    
+    def library_ids(self) -> List[str]:
+        return [lib_config["id"] for lib_config in self.libraries_config["libraries"]]
+    
+    def get_library(self, library_id: str) -> Optional[Library]:
+        """Get a library, loading it from disk on first access"""
+        if library_id in self.libraries:
+            return self.libraries[library_id]
+        
+        with self.load_lock:
+            if library_id in self.libraries:
+                return self.libraries[library_id]
             
-            # Create file paths for this library
-            csv_file = os.path.join(self.base_path, f"books_{lib_id}.csv")
+            lib_config = self.get_library_config(library_id)
+            if lib_config is None:
+                return None
             
-            # Create Library instance
-            library = Library(lib_name, csv_file, self.dnf_csv_file)
-            self.libraries[lib_id] = library
-        
-        # Set current library
-        self.current_library_id = self.libraries_config.get("current_library", "main")
-        
-        # Load DNF books (shared across all libraries)
-        if self.libraries:
-            first_library = list(self.libraries.values())[0]
-            self.dnf_books = first_library.dnf_books
+            csv_file = os.path.join(self.base_path, f"books_{library_id}.csv")
+            with timer("library_manager.load_library"):
+                library = Library(lib_config["name"], csv_file, self.dnf_csv_file,
+                                  lib_config.get("storage", "json"), dnf_books=self.get_dnf_books(),
+                                  persistence=self.persistence)
+            self.libraries[library_id] = library
+            return library
+    
+    def load_all_libraries(self):
+        """Eagerly load every library from configuration"""
+        for lib_id in self.library_ids():
+            self.get_library(lib_id)
     
     def get_current_library(self) -> Optional[Library]:
         """Get the currently active library"""
-        if self.current_library_id and self.current_library_id in self.libraries:
-            return self.libraries[self.current_library_id]
+        if self.current_library_id:
+            return self.get_library(self.current_library_id)
         return None
     
     def switch_library(self, library_id: str) -> bool:
         """Switch to a different library"""
-        if library_id in self.libraries:
+        if self.get_library(library_id) is not None:
             self.current_library_id = library_id
             self.libraries_config["current_library"] = library_id
             self.save_libraries_config()
             return True
         return False
     
-    def create_library(self, name: str, color: str = "#2196F3", icon: str = "library_books") -> Optional[str]:
+    def create_library(self, name: str, color: str = "#2196F3", icon: str = "library_books",
+                       storage: str = "json") -> Optional[str]:
         """Create a new library (max 5 libraries)"""
-        if len(self.libraries) >= self.libraries_config.get("max_libraries", 5):
+        if len(self.library_ids()) >= self.libraries_config.get("max_libraries", 5):
             return None  # Max libraries reached
         
         # Generate unique ID
         lib_id = name.lower().replace(" ", "_").replace("-", "_")
         counter = 1
         original_id = lib_id
-        while lib_id in self.libraries:
+        while lib_id in self.library_ids():
             lib_id = f"{original_id}_{counter}"
             counter += 1
         
@@ -117,7 +187,8 @@ class LibraryManager:
             "name": name,
             "created_date": datetime.now().isoformat(),
             "color": color,
-            "icon": icon
+            "icon": icon,
+            "storage": storage
         }
         
         # Add to configuration
@@ -126,18 +197,59 @@ class LibraryManager:
         
         # Create Library instance
         csv_file = os.path.join(self.base_path, f"books_{lib_id}.csv")
-        library = Library(name, csv_file, self.dnf_csv_file)
+        library = Library(name, csv_file, self.dnf_csv_file, storage,
+                          dnf_books=self.get_dnf_books(), persistence=self.persistence)
         self.libraries[lib_id] = library
         
         return lib_id
     
+    def set_library_storage(self, library_id: str, storage: str) -> bool:
+        """Switch a library between the "json", "binary", "mapped" and "sqlite" storage backends"""
+        if storage not in ("json", "binary", "mapped", "sqlite"):
+            return False
+        
+        old_library = self.get_library(library_id)
+        if old_library is None:
+            return False
+        if old_library.storage == storage:
+            return True
+        
+        # Run the old library's queued journal flush now: left queued, it would append records
+        # the new snapshot already holds to the journal both backends share
+        self.persistence.flush()
+        
+        # Carry the in-memory books over and write them in the new format
+        library = Library(old_library.name, old_library.csv_file, self.dnf_csv_file, storage,
+                          dnf_books=self.get_dnf_books(), persistence=self.persistence)
+        library.books = old_library.books
+        library.rebuild_indexes()
+        try:
+            library.save_books()
+        except StoreWriteError as e:
+            # Stay on the old backend rather than switch to a database missing the books
+            print(f"⚠️ {e}")
+            library.store.close()
+            return False
+        if old_library.store:
+            old_library.store.close()
+        self.libraries[library_id] = library
+        
+        for lib_config in self.libraries_config["libraries"]:
+            if lib_config["id"] == library_id:
+                lib_config["storage"] = storage
+                break
+        
+        self.save_libraries_config()
+        return True
+    
     def rename_library(self, library_id: str, new_name: str) -> bool:
         """Rename an existing library"""
-        if library_id not in self.libraries:
+        if library_id not in self.library_ids():
             return False
         
-        # Update library name
-        self.libraries[library_id].name = new_name
+        # Update library name (unloaded libraries pick it up from the config)
+        if library_id in self.libraries:
+            self.libraries[library_id].name = new_name
         
         # Update configuration
         for lib_config in self.libraries_config["libraries"]:
@@ -150,21 +262,27 @@ class LibraryManager:
     
     def delete_library(self, library_id: str) -> bool:
         """Delete a library (cannot delete if it's the only one)"""
-        if len(self.libraries) <= 1 or library_id not in self.libraries:
+        library_ids = self.library_ids()
+        if len(library_ids) <= 1 or library_id not in library_ids:
             return False
         
+        # Don't let a queued save recreate the files after they are deleted
+        self.persistence.flush()
+        
+        # Close the database before its files go away
+        library = self.libraries.pop(library_id, None)
+        if library and library.store:
+            library.store.close()
+        
         # Remove library files
-        library = self.libraries[library_id]
         try:
-            if os.path.exists(library.csv_file):
-                os.remove(library.csv_file)
-            if os.path.exists(library.json_file):
-                os.remove(library.json_file)
+            for path in self.library_files(library_id):
+                if os.path.exists(path):
+                    os.remove(path)
         except Exception as e:
             print(f"⚠️ Error deleting library files: {e}")
         
-        # Remove from memory
-        del self.libraries[library_id]
+        self.manifest.pop(library_id, None)
         
         # Remove from configuration
         self.libraries_config["libraries"] = [
@@ -174,34 +292,62 @@ class LibraryManager:
         
         # Switch to another library if this was current
         if self.current_library_id == library_id:
-            self.current_library_id = list(self.libraries.keys())[0]
+            self.current_library_id = self.library_ids()[0]
             self.libraries_config["current_library"] = self.current_library_id
         
         self.save_libraries_config()
         return True
     
+    def set_durability(self, mode: str) -> bool:
+        """Choose when library changes reach disk: immediate, debounced or manual"""
+        if mode not in DURABILITY_MODES:
+            return False
+        self.persistence.set_mode(mode)
+        self.libraries_config["durability"] = mode
+        self.save_libraries_config()
+        return True
+    
+    def flush(self):
+        """Write every queued library change now (call before exiting)"""
+        self.persistence.flush()
+        self.save_manifest()
+    
+    def get_book_count(self, library_id: str) -> int:
+        """Book count from the loaded library, or from the manifest while it is still valid"""
+        if library_id not in self.libraries:
+            entry = self.manifest.get(library_id)
+            if entry and entry.get("signature") == self.library_signature(library_id):
+                return entry["book_count"]
+        library = self.get_library(library_id)
+        return len(library.books) if library else 0
+    
+    def get_library_configs(self) -> List[Dict]:
+        """Configured libraries (id, name, color, icon) without loading any of them"""
+        return list(self.libraries_config["libraries"])
+    
     def get_library_list(self) -> List[Dict]:
         """Get list of all libraries with metadata"""
-        return [
+        libraries = [
             {
                 "id": lib_config["id"],
                 "name": lib_config["name"],
                 "color": lib_config.get("color", "#2196F3"),
                 "icon": lib_config.get("icon", "library_books"),
-                "book_count": len(self.libraries[lib_config["id"]].books) if lib_config["id"] in self.libraries else 0,
+                "book_count": self.get_book_count(lib_config["id"]),
                 "is_current": lib_config["id"] == self.current_library_id
             }
             for lib_config in self.libraries_config["libraries"]
         ]
+        self.save_manifest()
+        return libraries
     
     def move_books_between_libraries(self, book_titles: List[str], from_library_id: str, to_library_id: str) -> int:
         """Move books from one library to another. Returns number of books moved."""
-        if from_library_id not in self.libraries or to_library_id not in self.libraries:
+        from_lib = self.get_library(from_library_id)
+        to_lib = self.get_library(to_library_id)
+        if from_lib is None or to_lib is None:
             return 0
         
-        from_lib = self.libraries[from_library_id]
-        to_lib = self.libraries[to_library_id]
-        
         moved_count = 0
         books_to_move = []
         
@@ -210,25 +356,24 @@ class LibraryManager:
             if book.title in book_titles:
                 books_to_move.append(book)
         
-        # Move books
+        # Move books (each move is journaled by both libraries)
         for book in books_to_move:
-            from_lib.books.remove(book)
-            to_lib.books.append(book)
-            moved_count += 1
-        
-        # Save both libraries
-        if moved_count > 0:
-            from_lib.save_books()
-            to_lib.save_books()
+            if from_lib.discard_book(book):
+                to_lib.add_book(book)
+                moved_count += 1
         
         return moved_count
     
     def get_all_books_count(self) -> int:
         """Get total number of books across all libraries"""
-        total = sum(len(library.books) for library in self.libraries.values())
-        total += len(self.dnf_books)
+        total = sum(self.get_book_count(lib_id) for lib_id in self.library_ids())
+        total += len(self.get_dnf_books())
         return total
     
     def get_dnf_books(self):
-        """Get DNF books (shared across all libraries)"""
+        """Get DNF books (shared across all libraries, read from disk once)"""
+        if self.dnf_books is None:
+            with self.load_lock:
+                if self.dnf_books is None:
+                    self.dnf_books = Library.read_dnf_csv(self.dnf_csv_file)
         return self.dnf_books
\ No newline at end of file
@@ -0,0 +1,122 @@
+import time
+import atexit
+import threading
+from typing import Callable, Dict, Hashable
+
+DURABILITY_MODES = ("immediate", "debounced", "manual")
+
+class PersistenceScheduler:
+    """Coalesces pending library writes and runs them off the UI thread.
+
+    immediate: every save runs synchronously in the caller, like before.
+    debounced: saves are queued per key and run on a background thread once
+               edits pause for `delay` seconds (or after `max_delay` at most).
+    manual:    saves are queued until flush() is called.
+    """
+
+    def __init__(self, mode: str = "debounced", delay: float = 0.5, max_delay: float = 5.0):
+        self.mode = mode if mode in DURABILITY_MODES else "debounced"
+        self.delay = delay
+        self.max_delay = max_delay
+        self.pending: Dict[Hashable, Callable] = {}
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.first_dirty = None
+        self.deadline = None
+        self.thread = None
+        self.stopped = False
+        self.writes = 0
+        self.coalesced = 0
+        atexit.register(self.flush)
+
+    def set_mode(self, mode: str):
+        if mode not in DURABILITY_MODES:
+            return
+        with self.condition:
+            self.mode = mode
+            if mode == "manual":
+                # Queued writes now wait for an explicit flush()
+                self.first_dirty = None
+                self.deadline = None
+            elif mode == "debounced" and self.pending:
+                self.first_dirty = time.monotonic()
+                self.deadline = self.first_dirty + self.delay
+                self._ensure_worker()
+                self.condition.notify()
+        if mode == "immediate":
+            self.flush()
+
+    def mark_dirty(self, key: Hashable, save: Callable):
+        """Queue `save` under `key`; a newer request for the same key replaces the pending one"""
+        if self.mode == "immediate":
+            self._run_batch({key: save})
+            return
+
+        with self.condition:
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = save
+            if self.mode == "debounced":
+                now = time.monotonic()
+                if self.first_dirty is None:
+                    self.first_dirty = now
+                self.deadline = min(now + self.delay, self.first_dirty + self.max_delay)
+                self._ensure_worker()
+                self.condition.notify()
+
+    def has_pending(self) -> bool:
+        with self.condition:
+            return bool(self.pending)
+
+    def flush(self):
+        """Run every pending save now, in the calling thread"""
+        with self.condition:
+            batch = self._take_pending()
+        self._run_batch(batch)
+
+    def stop(self):
+        self.flush()
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+    def _take_pending(self) -> Dict[Hashable, Callable]:
+        batch = self.pending
+        self.pending = {}
+        self.first_dirty = None
+        self.deadline = None
+        return batch
+
+    def _run_batch(self, batch: Dict[Hashable, Callable]):
+        if not batch:
+            return
+        with self.write_lock:
+            for key, save in batch.items():
+                try:
+                    save()
+                    self.writes += 1
+                except Exception as e:
+                    print(f"⚠️ Error in background save for {key}: {e}")
+
+    def _ensure_worker(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped = False
+            self.thread = threading.Thread(target=self._run, name="library-persistence", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        with self.condition:
+            while not self.stopped:
+                if not self.pending or self.deadline is None or self.mode != "debounced":
+                    self.condition.wait()
+                    continue
+                remaining = self.deadline - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                batch = self._take_pending()
+                self.condition.release()
+                try:
+                    self._run_batch(batch)
+                finally:
+                    self.condition.acquire()
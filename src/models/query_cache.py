@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional
+from .book import Book
+from .binary_snapshot import LazyBook
+
+# Custom order for the "Status" sort: Currently Reading → To Be Read → Finished
+STATUS_ORDER = {"Currently Reading": 0, "To Be Read": 1, "Finished": 2, "Did Not Finish": 3}
+
+SORT_OPTIONS = ("Status", "Name (A-Z)", "Author", "Genre", "Rating", "Date Added")
+
+class QueryCache:
+    """Memoized filter/sort results for a library's book list view.
+
+    Results are keyed by (library version, search text, status, rating, sort key),
+    so any mutation makes them stale. Lowercased sort keys are kept per book and
+    dropped when that book changes, except for books still read from a mapped
+    snapshot: their keys come from the record's title and string ids alone, and
+    keeping them would hold a copy of every record the mapping leaves on disk.
+    Full-library sort orders are kept per sort key.
+    """
+
+    def __init__(self, library, max_entries: int = 32):
+        self.library = library
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.results: "OrderedDict[tuple, List[Book]]" = OrderedDict()
+        self.results_version = None
+        # id(book) -> (title, author, first genre, all lowercased; status, rating)
+        self.sort_keys: Dict[int, Tuple[str, str, str, str, int]] = {}
+        self.sorted_orders: Dict[str, Tuple[int, List[Book]]] = {}
+        self.last_search = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def invalidate(self, book: Book):
+        """Forget the sort keys of a book that was added, changed or removed"""
+        with self.lock:
+            self.sort_keys.pop(id(book), None)
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.sort_keys.clear()
+            self.sorted_orders.clear()
+            self.last_search = None
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self.results), 'sort_keys': len(self.sort_keys)}
+
+    def sort_key(self, book: Book) -> Tuple[str, str, str, str, int]:
+        keys = self.sort_keys.get(id(book))
+        if keys is None:
+            title, author, genres, status, rating = book.sort_fields()
+            keys = (title.lower(), author.lower(), genres[0].lower() if genres else "zzz", status, rating)
+            if not (isinstance(book, LazyBook) and book.mapped):
+                self.sort_keys[id(book)] = keys
+        return keys
+
+    def query(self, search: str = "", status: Optional[str] = None, rating: Optional[int] = None,
+              sort_by: str = "Status") -> List[Book]:
+        """Filtered and sorted books; status/rating of None means any, rating 0 means unrated"""
+        search = search.lower()
+        version = self.library.version
+        key = (version, search, status, rating, sort_by)
+        with self.lock:
+            cached = self.results.get(key)
+            if cached is not None:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+
+        if search:
+            # Search hits keep their relevance order for ties, like before
+            books = self.filter(list(self.search(search, version)), status, rating)
+            with self.lock:
+                books = self.sort(books, sort_by)
+        else:
+            # Filtering a sorted list gives the same order as sorting the filtered one
+            books = self.filter(self.sorted_books(sort_by, version), status, rating)
+
+        with self.lock:
+            if self.results_version != version:
+                # Every entry from an older version is stale now
+                self.results = OrderedDict((k, v) for k, v in self.results.items() if k[0] == version)
+                self.results_version = version
+            self.results[key] = books
+            while len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+                self.evictions += 1
+        return list(books)
+
+    def search(self, query: str, version: int) -> List[Book]:
+        """Search the library index, narrowing the previous hits when the query extends the last one"""
+        within = None
+        last_search = self.last_search
+        if last_search:
+            last_version, last_query, last_results = last_search
+            if last_version == version and last_query in query:
+                within = last_results
+        results = self.library.search_books(query, include_review=False, within=within)
+        self.last_search = (version, query, results)
+        return results
+
+    @staticmethod
+    def filter(books: List[Book], status: Optional[str], rating: Optional[int]) -> List[Book]:
+        if status is not None:
+            books = [book for book in books if book.status == status]
+        if rating is not None:
+            books = [book for book in books if book.rating == rating]
+        return books
+
+    def sorted_books(self, sort_by: str, version: int) -> List[Book]:
+        """The whole library in `sort_by` order, re-sorted only after a mutation"""
+        with self.lock:
+            cached = self.sorted_orders.get(sort_by)
+            if cached and cached[0] == version:
+                return cached[1]
+            books = self.sort(list(self.library.books), sort_by)
+            self.sorted_orders[sort_by] = (version, books)
+            return books
+
+    def sort(self, books: List[Book], sort_by: str) -> List[Book]:
+        """Sort in place using the cached per-book keys (callers hold self.lock)"""
+        sort_key = self.sort_key
+        if sort_by == "Status":
+            def status_key(book):
+                keys = sort_key(book)
+                return STATUS_ORDER.get(keys[3], 4), keys[0]
+            books.sort(key=status_key)
+        elif sort_by == "Name (A-Z)":
+            books.sort(key=lambda book: sort_key(book)[0])
+        elif sort_by == "Author":
+            books.sort(key=lambda book: sort_key(book)[1])
+        elif sort_by == "Genre":
+            books.sort(key=lambda book: sort_key(book)[2])
+        elif sort_by == "Rating":
+            books.sort(key=lambda book: sort_key(book)[4], reverse=True)  # Highest first
+        elif sort_by == "Date Added":
+            # For now, sort by title as we don't have date_added field yet
+            books.sort(key=lambda book: sort_key(book)[0], reverse=True)
+        return books
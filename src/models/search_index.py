@@ -0,0 +1,275 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, repeat
+import operator
+from typing import List, Dict, Iterable, Optional, Tuple
+from .book import Book
+
+# Relevance weight of a match in each searchable field
+FIELD_WEIGHTS = {'title': 4.0, 'author': 3.0, 'genre': 2.0, 'review': 1.0}
+# Fields kept per book, in the order of the tuples from values(); reviews aren't
+INDEXED_FIELDS = ('title', 'author', 'genre')
+# Control characters between a book's genres and between books in a field's haystack;
+# a query containing either can't match
+FIELD_SEPARATOR = '\x1f'
+ROW_SEPARATOR = '\x1e'
+# What can border a whole value in a haystack ('' past either end of the text)
+VALUE_ENDS = (FIELD_SEPARATOR, ROW_SEPARATOR, '')
+
+class SearchIndex:
+    """Substring search over title, author and genres, one lowercased haystack per field.
+
+    Each book's title, author and genres (joined) are kept by row, in library order, one
+    column per field; the columns hold the book's own strings. A search lowercases each
+    column joined into one haystack (again only after a mutation) and walks its hits with
+    str.find: the text around a hit tells whether it is the whole value or starts a word,
+    so there is no per-book work beyond the books that match. Reviews aren't indexed: the
+    library view never searches them, so a search that asks for them scans a haystack of
+    the reviews made for that search alone.
+
+    Nothing is built until the first search: a library that is only browsed never
+    pays for it. Until then mutations are no-ops; the build reads the live book list.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self.reset(books)
+
+    def reset(self, books: Iterable[Book]):
+        """Drop the index; it is built from `books` (the live list) on the next search"""
+        self.rebuild(())
+        self.deferred_books = books
+
+    def ensure_built(self):
+        if self.deferred_books is not None:
+            self.rebuild(self.deferred_books)
+
+    def rebuild(self, books: Iterable[Book]):
+        """Index a full book list from scratch, in library order"""
+        # Row -> book (None once removed); rows keep their order, so a row is a rank
+        self.books: List[Optional[Book]] = list(books)
+        self.columns: Dict[str, List[str]] = {field: [] for field in INDEXED_FIELDS}
+        # One pass over the books: a "mapped" book decodes its record once for all three values
+        add_title, add_author, add_genres = (self.columns[field].append for field in INDEXED_FIELDS)
+        join_genres = FIELD_SEPARATOR.join
+        for book in self.books:
+            add_title(book.title)
+            add_author(book.author)
+            add_genres(join_genres(book.genre))
+        self.rows: Dict[int, int] = {id(book): row for row, book in enumerate(self.books)}
+        self.removed = 0
+        self.haystacks = None
+        # Cleared last: a search that sees it cleared finds the index complete
+        self.deferred_books = None
+
+    @staticmethod
+    def values(book: Book) -> Tuple[str, str, str]:
+        """Title, author and genres, in INDEXED_FIELDS order"""
+        return book.title, book.author, FIELD_SEPARATOR.join(book.genre)
+
+    def set_row(self, row: int, values: Tuple[str, str, str]):
+        for field, value in zip(INDEXED_FIELDS, values):
+            self.columns[field][row] = value
+        self.haystacks = None
+
+    def add(self, book: Book):
+        if self.deferred_books is not None:
+            return
+        if id(book) in self.rows:
+            self.remove(book)
+        self.rows[id(book)] = len(self.books)
+        self.books.append(book)
+        for field, value in zip(INDEXED_FIELDS, self.values(book)):
+            self.columns[field].append(value)
+        self.haystacks = None
+
+    def remove(self, book: Book):
+        row = self.rows.pop(id(book), None)
+        if row is None:
+            return
+        self.books[row] = None
+        self.set_row(row, ('', '', ''))
+        self.removed += 1
+        if self.removed > 1024 and self.removed * 2 > len(self.books):
+            self.compact()
+
+    def compact(self):
+        """Drop the rows of removed books"""
+        live = [row for row, book in enumerate(self.books) if book is not None]
+        self.books = [self.books[row] for row in live]
+        self.columns = {field: [column[row] for row in live] for field, column in self.columns.items()}
+        self.rows = {id(book): row for row, book in enumerate(self.books)}
+        self.removed = 0
+        self.haystacks = None
+
+    def update(self, book: Book):
+        """Re-index a book whose fields were edited in place, keeping its position"""
+        if self.deferred_books is not None:
+            return
+        row = self.rows.get(id(book))
+        if row is None:
+            self.add(book)
+            return
+        self.set_row(row, self.values(book))
+
+    def snapshot(self) -> Tuple[Dict[str, Tuple[str, array]], List[Optional[Book]]]:
+        """({field: (haystack, start offset of every row plus the end)}, books by row) as of now"""
+        haystacks = self.haystacks
+        if haystacks is None:
+            # Copies, so a search running next to a mutation sees one consistent state
+            books = list(self.books)
+            columns = {field: list(column) for field, column in self.columns.items()}
+            count = min(len(books), *(len(column) for column in columns.values()))
+            if count < len(books):
+                books = books[:count]
+            fields = {field: self.haystack(column[:count] if count < len(column) else column)
+                      for field, column in columns.items()}
+            haystacks = self.haystacks = (fields, books)
+        return haystacks
+
+    @staticmethod
+    def haystack(values: List[str]) -> Tuple[str, array]:
+        """(values lowercased and joined, start offset of every value plus the end)"""
+        joined = ROW_SEPARATOR.join(values)
+        haystack = joined.lower()
+        if len(haystack) != len(joined):
+            # A few characters lowercase to more than one; lowercase value by value so offsets line up
+            values = [value.lower() for value in values]
+            haystack = ROW_SEPARATOR.join(values)
+        return haystack, array('I', accumulate(map(operator.add, map(len, values), repeat(1)), initial=0))
+
+    @staticmethod
+    def factor(before: str, after: str) -> int:
+        """3 for a match that is a whole value, 2 at the start of a word, else 1, from the
+        characters around it"""
+        if before in VALUE_ENDS:
+            return 3 if after in VALUE_ENDS else 2
+        return 1 if before.isalnum() else 2
+
+    @classmethod
+    def add_matches(cls, query: str, haystack: str, starts: array, weight: float, scores: Dict[int, float]):
+        """Add the weight of its first match of `query` to the score of every row that has one"""
+        find = haystack.find
+        get = scores.get
+        length = len(query)
+        position = find(query)
+        while position >= 0:
+            row = bisect_right(starts, position) - 1
+            # factor(), inlined: this runs once per hit
+            if position == starts[row]:
+                end = position + length
+                factor = 3 if end == starts[row + 1] - 1 or haystack[end] == FIELD_SEPARATOR else 2
+            else:
+                before = haystack[position - 1]
+                factor = 1 if before.isalnum() else 3 if before == FIELD_SEPARATOR and (
+                    haystack[position + length:position + length + 1] in VALUE_ENDS) else 2
+            scores[row] = get(row, 0.0) + weight * factor
+            position = find(query, starts[row + 1])
+
+    @classmethod
+    def weigh(cls, value: str, query: str, weight: float) -> float:
+        """Weight of the first match of `query` in one value, 0 without one"""
+        position = value.find(query)
+        if position < 0:
+            return 0.0
+        end = position + len(query)
+        return weight * cls.factor(value[position - 1] if position else '', value[end:end + 1])
+
+    @classmethod
+    def score(cls, query: str, haystacks: Dict[str, Tuple[str, array]], row: int, fields: Iterable[str]) -> float:
+        """Relevance of one row's indexed fields (not its review) for `query`"""
+        score = 0.0
+        for field in fields:
+            haystack, starts = haystacks[field]
+            value = haystack[starts[row]:starts[row + 1] - 1]
+            if field == 'genre':
+                # The first matching genre counts
+                for genre in value.split(FIELD_SEPARATOR) if value else ():
+                    if query in genre:
+                        score += cls.weigh(genre, query, FIELD_WEIGHTS[field])
+                        break
+            else:
+                score += cls.weigh(value, query, FIELD_WEIGHTS[field])
+        return score
+
+    @classmethod
+    def add_review_matches(cls, query: str, books: List[Optional[Book]], rows: Iterable[int],
+                           scores: Dict[int, float]):
+        """Add the review weight of each of `rows` whose review contains `query`"""
+        weight = FIELD_WEIGHTS['review']
+        for row in rows:
+            book = books[row]
+            if book is not None and book.review:
+                review = book.review.lower()
+                if query in review:
+                    scores[row] = scores.get(row, 0.0) + cls.weigh(review, query, weight)
+
+    @classmethod
+    def scan_reviews(cls, query: str, books: List[Optional[Book]], scores: Dict[int, float]):
+        """Add the review weight of every book whose review contains `query`, from one
+        lowercased haystack of all the reviews that lives only as long as this search"""
+        reviews = [book.review if book is not None else '' for book in books]
+        joined = ROW_SEPARATOR.join(reviews)
+        haystack = joined.lower()
+        if len(haystack) != len(joined) or haystack.count(ROW_SEPARATOR) != len(reviews) - 1:
+            # Offsets or separators don't line up with the reviews; check them one by one
+            cls.add_review_matches(query, books, range(len(books)), scores)
+            return
+        find = haystack.find
+        count = haystack.count
+        get = scores.get
+        factor = cls.factor
+        weight = FIELD_WEIGHTS['review']
+        length = len(query)
+        row = counted = 0
+        position = find(query)
+        while position >= 0:
+            # Rows are found by counting the separators since the last hit's review
+            row += count(ROW_SEPARATOR, counted, position)
+            before = haystack[position - 1] if position else ''
+            scores[row] = get(row, 0.0) + weight * factor(before, haystack[position + length:position + length + 1])
+            counted = find(ROW_SEPARATOR, position)
+            if counted < 0:
+                break
+            position = find(query, counted)
+
+    def search(self, query: str, fields: Iterable[str] = tuple(FIELD_WEIGHTS),
+               within: Iterable[Book] = None) -> List[Book]:
+        """Return books containing the query in any of the given fields, most relevant first.
+
+        `within` restricts the search to an earlier result set, e.g. the hits for a
+        shorter query that this one extends.
+        """
+        self.ensure_built()
+        query = query.lower()
+        fields = tuple(fields)
+        indexed = [field for field in fields if field != 'review']
+        haystacks, books = self.snapshot()
+        scores: Dict[int, float] = {}
+        if within is None and query and FIELD_SEPARATOR not in query and ROW_SEPARATOR not in query:
+            for field in indexed:
+                self.add_matches(query, *haystacks[field], FIELD_WEIGHTS[field], scores)
+            if 'review' in fields:
+                # A review can match in a book nothing else matched
+                self.scan_reviews(query, books, scores)
+        else:
+            if within is not None:
+                rows = [(self.rows.get(id(book), -1), book) for book in within]
+                rows = [row for row, book in rows if 0 <= row < len(books) and books[row] is book]
+            elif not query:
+                rows = [row for row, book in enumerate(books) if book is not None]
+            else:
+                rows = []
+            for row in rows:
+                score = self.score(query, haystacks, row, indexed)
+                if score > 0:
+                    scores[row] = score
+            if 'review' in fields:
+                self.add_review_matches(query, books, rows, scores)
+
+        # Best score first, library order among equals (a reversed sort keeps ties in order)
+        ranked = sorted(scores)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return [books[row] for row in ranked if books[row] is not None]
+
+    def __len__(self) -> int:
+        return len(self.rows)
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Tuple
+from .book import Book
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'To Be Read',
+    rating INTEGER NOT NULL DEFAULT 0,
+    review TEXT NOT NULL DEFAULT '',
+    total_pages INTEGER NOT NULL DEFAULT 0,
+    pages_read INTEGER NOT NULL DEFAULT 0,
+    date_started TEXT NOT NULL DEFAULT '',
+    date_finished TEXT NOT NULL DEFAULT '',
+    reading_time_minutes INTEGER NOT NULL DEFAULT 0,
+    isbn TEXT NOT NULL DEFAULT '',
+    cover_url TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS genres (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS book_genres (
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    genre_id INTEGER NOT NULL REFERENCES genres(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (book_id, position)
+);
+-- Lookups are answered from Library's in-memory indexes, never from SQL, so secondary
+-- indexes would only slow every write; drop the ones earlier versions created
+DROP INDEX IF EXISTS idx_books_status;
+DROP INDEX IF EXISTS idx_books_rating;
+DROP INDEX IF EXISTS idx_books_author;
+DROP INDEX IF EXISTS idx_books_title;
+DROP INDEX IF EXISTS idx_books_isbn;
+DROP INDEX IF EXISTS idx_book_genres_genre;
+"""
+
+BOOK_COLUMNS = [
+    'title', 'author', 'status', 'rating', 'review', 'total_pages', 'pages_read',
+    'date_started', 'date_finished', 'reading_time_minutes', 'isbn', 'cover_url'
+]
+
+class StoreWriteError(Exception):
+    """A change could not be written; the database is unchanged and behind Library.books"""
+
+class SQLiteBookStore:
+    """SQLite storage for a library, kept row-for-row in sync with Library.books.
+
+    The database is only written and loaded in full: it makes an add, edit or removal
+    a one-row write instead of rewriting the whole file. Reads by title, author, status,
+    genre, rating or ISBN go through the library's in-memory indexes like every backend.
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        # Opened on the startup thread but written from the UI, the persistence worker and
+        # enrichment jobs; the lock serializes every use of the connection
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+        # Row ids in the same order as Library.books
+        self.row_ids: List[int] = []
+        self.genre_ids: Dict[str, int] = {}
+
+    def is_migrated(self) -> bool:
+        """Whether the JSON/CSV files have already been imported into this database"""
+        with self.lock:
+            return self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+    def load_books(self) -> List[Book]:
+        """Load every book in insertion order"""
+        with self.lock:
+            genres_by_book: Dict[int, List[str]] = {}
+            for book_id, name in self.conn.execute(
+                    "SELECT bg.book_id, g.name FROM book_genres bg JOIN genres g ON g.id = bg.genre_id "
+                    "ORDER BY bg.book_id, bg.position"):
+                genres_by_book.setdefault(book_id, []).append(name)
+
+            self.row_ids = []
+            books = []
+            for row in self.conn.execute(f"SELECT id, {', '.join(BOOK_COLUMNS)} FROM books ORDER BY id"):
+                book = Book(genre=genres_by_book.get(row[0], []), **dict(zip(BOOK_COLUMNS, row[1:])))
+                self.row_ids.append(row[0])
+                books.append(book)
+            return books
+
+    @contextmanager
+    def transaction(self, action: str):
+        """Hold the connection for one transaction; on failure roll back, restore the row ids
+        and raise StoreWriteError"""
+        with self.lock:
+            row_ids = list(self.row_ids)
+            genre_ids = dict(self.genre_ids)
+            try:
+                with self.conn:
+                    yield
+            except (sqlite3.Error, IndexError) as e:
+                self.row_ids = row_ids
+                self.genre_ids = genre_ids
+                raise StoreWriteError(f"Error {action} in {os.path.basename(self.db_file)}: {e}") from e
+
+    def replace_all(self, books: List[Book]):
+        """Replace the stored library in one transaction (used for migration and full saves)"""
+        with self.transaction(f"saving {len(books)} books"):
+            self.conn.execute("DELETE FROM books")
+            self.row_ids = []
+            for book in books:
+                self._insert(book)
+            self.conn.execute("PRAGMA user_version = 1")
+
+    def apply(self, op: str, index: int = None, book: Book = None):
+        """Apply a single add/remove/update, mirroring the journal record format"""
+        with self.transaction(f"writing '{op}'"):
+            if op == 'add':
+                self._insert(book)
+            elif op == 'remove':
+                row_id = self.row_ids.pop(index)
+                self.conn.execute("DELETE FROM books WHERE id = ?", (row_id,))
+            elif op == 'update':
+                self._update(index, book)
+
+    def add_many(self, books: List[Book]):
+        """Append many books in one transaction"""
+        with self.transaction(f"writing {len(books)} books"):
+            for book in books:
+                self._insert(book)
+
+    def update_many(self, updates: List[Tuple[int, Book]]):
+        """Rewrite many (index, book) pairs in one transaction"""
+        with self.transaction(f"writing {len(updates)} updates"):
+            for index, book in updates:
+                self._update(index, book)
+
+    def _update(self, index: int, book: Book):
+        row_id = self.row_ids[index]
+        assignments = ', '.join(f"{column} = ?" for column in BOOK_COLUMNS)
+        self.conn.execute(f"UPDATE books SET {assignments} WHERE id = ?",
+                          self._values(book) + (row_id,))
+        self.conn.execute("DELETE FROM book_genres WHERE book_id = ?", (row_id,))
+        self._insert_genres(row_id, book)
+
+    def _values(self, book: Book) -> tuple:
+        return tuple(getattr(book, column) for column in BOOK_COLUMNS)
+
+    def _insert(self, book: Book):
+        placeholders = ', '.join('?' for _ in BOOK_COLUMNS)
+        cursor = self.conn.execute(
+            f"INSERT INTO books ({', '.join(BOOK_COLUMNS)}) VALUES ({placeholders})", self._values(book))
+        self.row_ids.append(cursor.lastrowid)
+        self._insert_genres(cursor.lastrowid, book)
+
+    def _insert_genres(self, row_id: int, book: Book):
+        rows = [(row_id, self._genre_id(genre), position) for position, genre in enumerate(book.genre)]
+        self.conn.executemany("INSERT INTO book_genres (book_id, genre_id, position) VALUES (?, ?, ?)", rows)
+
+    def _genre_id(self, name: str) -> int:
+        if name not in self.genre_ids:
+            self.conn.execute("INSERT OR IGNORE INTO genres (name) VALUES (?)", (name,))
+            self.genre_ids[name] = self.conn.execute(
+                "SELECT id FROM genres WHERE name = ?", (name,)).fetchone()[0]
+        return self.genre_ids[name]
+
+    def close(self):
+        try:
+            with self.lock:
+                self.conn.close()
+        except Exception as e:
+            print(f"⚠️ Error closing SQLite store: {e}")
+
+    def delete_files(self):
+        """Close the connection and remove the database with its WAL side files"""
+        self.close()
+        for path in (self.db_file, f"{self.db_file}-wal", f"{self.db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,56 @@
+import os
+import pickle
+from typing import List, Optional, Tuple
+from .book import Book
+from utils.atomic_write import atomic_write
+
+# Bump when the pickled layout changes; older snapshots are then ignored
+STARTUP_SNAPSHOT_VERSION = 1
+
+# (search, status, rating, sort_by) of the list the snapshot was taken from
+ViewKey = Tuple[str, Optional[str], Optional[int], str]
+
+class StartupSnapshot:
+    """The first page of the current library's book list, pickled for the next launch.
+
+    The app renders it before any library file is parsed. It is only used when
+    the library's files still have the sizes and mtimes recorded with it, so an
+    edit made since (or by another copy of the app) simply means a normal load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, library_id: str, signature: List, view: ViewKey) -> Optional[List[Book]]:
+        """The snapshot's books if it matches the library's current files and view, else None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as file:
+                data = pickle.load(file)
+            if (data.get('version') != STARTUP_SNAPSHOT_VERSION or data.get('library_id') != library_id
+                    or data.get('signature') != signature or data.get('view') != view):
+                return None
+            return [Book.from_dict(book_data) for book_data in data['books']]
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable startup snapshot: {e}")
+            return None
+
+    def save(self, library_id: str, signature: List, view: ViewKey, books: List[Book]):
+        data = {
+            'version': STARTUP_SNAPSHOT_VERSION,
+            'library_id': library_id,
+            'signature': signature,
+            'view': view,
+            'books': [book.to_dict() for book in books],
+        }
+        try:
+            # A cache; losing it only costs one slower start
+            with atomic_write(self.path, 'wb', fsync=False) as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"⚠️ Error saving startup snapshot: {e}")
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
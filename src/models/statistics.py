@@ -0,0 +1,120 @@
+from typing import Dict, List, Iterable
+from .book import Book
+
+def compute_statistics(books: List[Book], dnf_books: List[Book]) -> Dict:
+    """Compute reading statistics from scratch with a full pass over the books"""
+    total_books = len(books) + len(dnf_books)  # Include DNF books in total
+    finished_books = len([b for b in books if b.status == "Finished"])
+    currently_reading = len([b for b in books if b.is_currently_reading()])
+    to_be_read = len([b for b in books if b.status == "To Be Read"])
+    dnf_count = len(dnf_books)  # Count from separate DNF list
+
+    total_pages_read = sum(b.pages_read for b in books if b.pages_read > 0)
+    total_reading_time = sum(b.reading_time_minutes for b in books)
+
+    # Genre statistics
+    genre_counts = {}
+    for book in books:
+        for genre in book.genre:
+            genre_counts[genre] = genre_counts.get(genre, 0) + 1
+
+    # Rating statistics
+    rated_books = [b for b in books if b.rating > 0]
+    avg_rating = sum(b.rating for b in rated_books) / len(rated_books) if rated_books else 0
+
+    return {
+        'total_books': total_books,
+        'finished_books': finished_books,
+        'currently_reading': currently_reading,
+        'to_be_read': to_be_read,
+        'dnf_books': dnf_count,
+        'total_pages_read': total_pages_read,
+        'total_reading_time_hours': total_reading_time / 60,
+        'genre_counts': genre_counts,
+        'average_rating': avg_rating,
+        'rated_books_count': len(rated_books)
+    }
+
+class ReadingStatistics:
+    """Running counters behind get_reading_statistics, updated in O(1) per book mutation"""
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self.rebuild(books)
+
+    def rebuild(self, books: Iterable[Book]):
+        self.book_count = 0
+        self.status_counts: Dict[str, int] = {}
+        self.currently_reading = 0
+        self.total_pages_read = 0
+        self.total_reading_time = 0
+        self.genre_counts: Dict[str, int] = {}
+        self.rating_sum = 0
+        self.rated_count = 0
+        # What each book contributed when it was counted, so in-place edits can be undone
+        self.contributions: Dict[int, tuple] = {}
+        for book in books:
+            self.add(book)
+
+    @staticmethod
+    def contribution(book: Book) -> tuple:
+        return (
+            book.status,
+            book.is_currently_reading(),
+            book.pages_read if book.pages_read > 0 else 0,
+            book.reading_time_minutes,
+            tuple(book.genre),
+            book.rating if book.rating > 0 else 0,
+        )
+
+    def _apply(self, contribution: tuple, sign: int):
+        status, reading, pages, minutes, genres, rating = contribution
+        self.book_count += sign
+        self.status_counts[status] = self.status_counts.get(status, 0) + sign
+        if not self.status_counts[status]:
+            del self.status_counts[status]
+        self.currently_reading += sign if reading else 0
+        self.total_pages_read += sign * pages
+        self.total_reading_time += sign * minutes
+        for genre in genres:
+            self.genre_counts[genre] = self.genre_counts.get(genre, 0) + sign
+            if not self.genre_counts[genre]:
+                del self.genre_counts[genre]
+        if rating:
+            self.rating_sum += sign * rating
+            self.rated_count += sign
+
+    def add(self, book: Book):
+        if id(book) in self.contributions:
+            self.remove(book)
+        contribution = self.contribution(book)
+        self.contributions[id(book)] = contribution
+        self._apply(contribution, 1)
+
+    def remove(self, book: Book):
+        contribution = self.contributions.pop(id(book), None)
+        if contribution is not None:
+            self._apply(contribution, -1)
+
+    def update(self, book: Book):
+        self.add(book)
+
+    def snapshot(self, dnf_count: int) -> Dict:
+        """Statistics in the same shape as compute_statistics"""
+        return {
+            'total_books': self.book_count + dnf_count,
+            'finished_books': self.status_counts.get("Finished", 0),
+            'currently_reading': self.currently_reading,
+            'to_be_read': self.status_counts.get("To Be Read", 0),
+            'dnf_books': dnf_count,
+            'total_pages_read': self.total_pages_read,
+            'total_reading_time_hours': self.total_reading_time / 60,
+            'genre_counts': dict(self.genre_counts),
+            'average_rating': self.rating_sum / self.rated_count if self.rated_count else 0,
+            'rated_books_count': self.rated_count
+        }
+
+    def verify(self, books: List[Book], dnf_books: List[Book]) -> List[str]:
+        """Compare the running counters with a full recompute, returning the keys that differ"""
+        expected = compute_statistics(books, dnf_books)
+        actual = self.snapshot(len(dnf_books))
+        return [key for key in expected if expected[key] != actual[key]]
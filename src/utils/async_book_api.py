@@ -0,0 +1,248 @@
+import json
+import asyncio
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Iterable, Tuple
+from .book_metadata import (OPEN_LIBRARY_URL, GOOGLE_BOOKS_URL, clean_isbn, open_library_path,
+                            google_books_path, parse_open_library, parse_google_books)
+from .response_cache import ResponseCache
+from .resilience import PROVIDERS, Provider, TransientError, parse_retry_after
+from .instrumentation import timed, timer
+
+class HostPool:
+    """Keep-alive connections to one host, with at most `limit` requests in flight"""
+
+    def __init__(self, base_url: str, limit: int = 4, timeout: float = 10):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(limit)
+        self.lock = threading.Lock()
+        self.idle: List[http.client.HTTPConnection] = []
+        self.requests = 0
+        self.connections_opened = 0
+
+    def connect(self) -> http.client.HTTPConnection:
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        with self.lock:
+            self.connections_opened += 1
+        return connection_class(self.host, timeout=self.timeout)
+
+    def get_json(self, path: str) -> Tuple[int, Optional[Dict]]:
+        """Blocking GET returning (status, parsed body or None); raises TransientError on network
+        errors, 429 and 5xx. Runs on the client's worker threads."""
+        try:
+            with timer(f"async_book_api.{self.host}"):
+                status, body, headers = self._get(path)
+        except (http.client.HTTPException, OSError) as e:
+            raise TransientError(f"{self.host}: {e}") from e
+        if status == 429 or status >= 500:
+            raise TransientError(f"HTTP {status} from {self.host}", parse_retry_after(headers.get('Retry-After')))
+        if status != 200:
+            return status, None
+        return status, json.loads(body)
+
+    def _get(self, path: str):
+        with self.slots:
+            with self.lock:
+                connection = self.idle.pop() if self.idle else None
+                self.requests += 1
+            reused = connection is not None
+            if connection is None:
+                connection = self.connect()
+            try:
+                status, body, headers, will_close = self._request(connection, path)
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server dropped the pooled connection while it sat idle; retry once fresh
+                connection = self.connect()
+                try:
+                    status, body, headers, will_close = self._request(connection, path)
+                except BaseException:
+                    connection.close()
+                    raise
+
+            if will_close:
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.append(connection)
+        return status, body, headers
+
+    def _request(self, connection: http.client.HTTPConnection, path: str):
+        connection.request('GET', self.prefix + path, headers={'Accept': 'application/json'})
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, body, response.msg, response.will_close
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+class AsyncBookAPI:
+    """Batched, concurrent ISBN lookups over pooled connections.
+
+    ISBNs are looked up `batch_size` at a time with a single Open Library
+    `bibkeys` request. Misses fall back to Google Books, and if Open Library
+    hasn't answered after `hedge_delay` seconds Google Books is raced for the
+    whole batch; the first hit per ISBN wins. Base URLs can point at a local
+    stub server. With a ResponseCache, cached ISBNs skip the network and only
+    definite answers are remembered. Every request goes through the provider's
+    rate limit, retries and circuit breaker (shared with BookAPI by default).
+    """
+
+    def __init__(self, open_library_url: str = OPEN_LIBRARY_URL, google_books_url: str = GOOGLE_BOOKS_URL,
+                 batch_size: int = 50, per_host_limit: int = 4, hedge_delay: float = 1.5, timeout: float = 10,
+                 cache: Optional[ResponseCache] = None, providers: Optional[Dict[str, Provider]] = None):
+        self.cache = cache
+        self.providers = providers or PROVIDERS
+        self.batch_size = batch_size
+        self.hedge_delay = hedge_delay
+        self.open_library = HostPool(open_library_url, per_host_limit, timeout)
+        self.google_books = HostPool(google_books_url, per_host_limit, timeout)
+        # Every pool can have all of its slots busy at once
+        self.executor = ThreadPoolExecutor(max_workers=per_host_limit * 2, thread_name_prefix="book-api")
+
+    async def get_json(self, provider: str, pool: HostPool, path: str) -> Tuple[int, Optional[Dict]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.providers[provider].call, lambda: pool.get_json(path))
+
+    async def fetch_open_library(self, isbns: List[str]) -> Optional[Dict[str, Dict]]:
+        """Hits for a batch of ISBNs from one Open Library request, or None if the request failed"""
+        try:
+            status, data = await self.get_json('openlibrary', self.open_library, open_library_path(isbns))
+            if status != 200 or data is None:
+                print(f"Open Library returned HTTP {status} for {len(isbns)} ISBNs")
+                return None
+            return {isbn: parse_open_library(isbn, data[f"ISBN:{isbn}"])
+                    for isbn in isbns if data.get(f"ISBN:{isbn}")}
+        except Exception as e:
+            print(f"Error looking up ISBNs {', '.join(isbns)}: {e}")
+            return None
+
+    async def fetch_google_books(self, isbn: str) -> Optional[Dict]:
+        """Google Books match for one ISBN, None if there is none; raises if Google Books failed"""
+        status, data = await self.get_json('googlebooks', self.google_books, google_books_path(isbn))
+        if status == 200 and data is not None:
+            return parse_google_books(isbn, data)
+        return None
+
+    async def lookup_batch(self, isbns: List[str]) -> Dict[str, Optional[Dict]]:
+        """Results for the ISBNs whose outcome is known; ISBNs left out could not be checked"""
+        results: Dict[str, Optional[Dict]] = {isbn: None for isbn in isbns}
+        unresolved = set(isbns)
+        open_library = asyncio.ensure_future(self.fetch_open_library(isbns))
+        open_library_failed = False
+        google: Dict[asyncio.Future, str] = {}
+        google_failed = set()
+        pending = {open_library}
+        hedged = False
+
+        def race_google(targets: Iterable[str]):
+            for isbn in targets:
+                task = asyncio.ensure_future(self.fetch_google_books(isbn))
+                google[task] = isbn
+                pending.add(task)
+
+        try:
+            while pending and unresolved:
+                timeout = None if hedged else self.hedge_delay
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Open Library is slow: hedge with Google Books for everything still open
+                    hedged = True
+                    race_google(sorted(unresolved))
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    if task is open_library:
+                        hedged = True
+                        open_library_failed = task.result() is None
+                        for isbn, data in (task.result() or {}).items():
+                            if isbn in unresolved:
+                                results[isbn] = data
+                                unresolved.discard(isbn)
+                        # Fall back to Google Books for misses that aren't racing already
+                        race_google(sorted(unresolved - set(google.values())))
+                    else:
+                        isbn = google[task]
+                        if task.exception():
+                            print(f"Error with Google Books API for ISBN {isbn}: {task.exception()}")
+                            google_failed.add(isbn)
+                            continue
+                        data = task.result()
+                        if data and isbn in unresolved:
+                            results[isbn] = data
+                            unresolved.discard(isbn)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # A miss only counts as "not found" when every provider actually answered
+        for isbn in unresolved:
+            if open_library_failed or isbn in google_failed:
+                del results[isbn]
+        return results
+
+    async def lookup_many(self, isbns: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Look up many ISBNs concurrently; keys are the cleaned ISBNs, None where nothing was found"""
+        unique = list(dict.fromkeys(clean_isbn(isbn) for isbn in isbns if isbn and clean_isbn(isbn)))
+        results: Dict[str, Optional[Dict]] = {}
+        if self.cache:
+            remaining = []
+            for isbn in unique:
+                found, value = self.cache.get(ResponseCache.isbn_key('lookup', isbn))
+                if found:
+                    results[isbn] = value
+                elif self.cache.offline:
+                    results[isbn] = None
+                else:
+                    remaining.append(isbn)
+            unique = remaining
+
+        batches = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+        for batch_results in await asyncio.gather(*(self.lookup_batch(batch) for batch in batches)):
+            results.update(batch_results)
+            if self.cache:
+                for isbn, value in batch_results.items():
+                    self.cache.put(ResponseCache.isbn_key('lookup', isbn), value)
+
+        # ISBNs that couldn't be checked come back as None too
+        for isbn in unique:
+            results.setdefault(isbn, None)
+        return results
+
+    async def lookup_isbn(self, isbn: str) -> Optional[Dict]:
+        isbn = clean_isbn(isbn)
+        return (await self.lookup_many([isbn])).get(isbn)
+
+    @timed("async_book_api.lookup_many")
+    def lookup_many_sync(self, isbns: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Blocking wrapper for callers without an event loop (e.g. Flet event handlers)"""
+        return asyncio.run(self.lookup_many(isbns))
+
+    @timed("async_book_api.lookup_isbn")
+    def lookup_isbn_sync(self, isbn: str) -> Optional[Dict]:
+        return asyncio.run(self.lookup_isbn(isbn))
+
+    def stats(self) -> Dict:
+        return {
+            'open_library_requests': self.open_library.requests,
+            'open_library_connections': self.open_library.connections_opened,
+            'google_books_requests': self.google_books.requests,
+            'google_books_connections': self.google_books.connections_opened,
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.open_library.close()
+        self.google_books.close()
@@ -0,0 +1,99 @@
+import os
+import json
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+# The process umask, read once at import: reading it means briefly setting it, which
+# other threads creating files at that moment would see
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+def backup_paths(path: str, backups: int) -> List[str]:
+    """Backup generations of a file, newest first"""
+    return [f"{path}.{generation}" for generation in range(1, backups + 1)]
+
+def rotate_backups(path: str, backups: int):
+    """Shift path.1 -> path.2 -> ... and keep a copy of the current file as path.1"""
+    if backups <= 0 or not os.path.exists(path):
+        return
+    generations = backup_paths(path, backups)
+    for older, newer in zip(reversed(generations[1:]), reversed(generations[:-1])):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+    if os.path.exists(generations[0]):
+        os.remove(generations[0])
+    try:
+        # A hard link keeps the current file in place, so there is never a moment without one
+        os.link(path, generations[0])
+    except OSError:
+        shutil.copy2(path, generations[0])
+
+def file_mode(path: str) -> int:
+    """Permission bits for a new version of `path`: the current file's, or what open() would
+    give a new file (mkstemp's are always 0600)"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~UMASK
+
+def fsync_directory(directory: str):
+    """Persist a rename in the directory entry itself (no-op where unsupported)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: Optional[str] = 'utf-8', newline: Optional[str] = None,
+                 backups: int = 0, fsync: bool = True):
+    """Write to a temp file next to `path` and rename it into place only once it is complete.
+
+    A crash mid-write leaves the previous file untouched. With `backups` set, the
+    previous generations are kept as path.1 (newest) to path.N.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        if 'b' in mode:
+            file = os.fdopen(fd, mode)
+        else:
+            file = os.fdopen(fd, mode, encoding=encoding, newline=newline)
+        with file:
+            os.chmod(temp_path, file_mode(path))
+            yield file
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        rotate_backups(path, backups)
+        os.replace(temp_path, path)
+        if fsync:
+            fsync_directory(directory)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def load_json_with_recovery(path: str, backups: int = 0) -> Tuple[Optional[dict], Optional[str]]:
+    """Load the newest generation of a JSON file that parses, returning (data, path it came from)"""
+    for candidate in [path] + backup_paths(path, backups):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'r', encoding='utf-8') as file:
+                return json.load(file), candidate
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {candidate}: {e}")
+    return None, None
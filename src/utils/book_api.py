@@ -1,8 +1,50 @@
 import requests
 import json
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Callable, Any
+from .book_metadata import (OPEN_LIBRARY_URL, GOOGLE_BOOKS_URL, clean_isbn, open_library_path,
+                            google_books_path, parse_open_library, parse_google_books)
+from .response_cache import ResponseCache
+from .resilience import PROVIDERS, TransientError, CircuitOpenError, parse_retry_after
+from .instrumentation import timer
+
+def is_transient(response) -> bool:
+    """Upstream trouble rather than an answer; such responses are never cached"""
+    return response.status_code == 429 or response.status_code >= 500
+
+def http_get(provider: str, url: str):
+    """GET through the provider's rate limit, retries and circuit breaker"""
+    def request():
+        try:
+            response = requests.get(url, timeout=10)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientError(str(e)) from e
+        if is_transient(response):
+            raise TransientError(f"HTTP {response.status_code} from {url}",
+                                 parse_retry_after(response.headers.get('Retry-After')))
+        return response
+    # Includes time spent waiting on the rate limit and between retries
+    with timer(f"book_api.{provider}"):
+        return PROVIDERS[provider].call(request)
 
 class BookAPI:
+    # Optional ResponseCache shared by every lookup; None means always go to the network
+    cache: Optional[ResponseCache] = None
+
+    @staticmethod
+    def cached_lookup(key: str, fetch: Callable[[], Any], default: Any = None) -> Any:
+        """Serve `key` from the cache, or fetch it and remember the result (errors are not remembered)"""
+        cache = BookAPI.cache
+        if cache:
+            found, value = cache.get(key)
+            if found:
+                return value
+            if cache.offline:
+                return default
+        value = fetch()
+        if cache:
+            cache.put(key, value)
+        return value
+
     @staticmethod
     def lookup_isbn(isbn: str) -> Optional[Dict]:
         """
@@ -10,95 +52,57 @@ class BookAPI:
         """
         try:
             # Clean ISBN
-            isbn = isbn.replace('-', '').replace(' ', '')
-            
-            # Try Open Library API
-            url = f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&jscmd=data&format=json"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                isbn_key = f"ISBN:{isbn}"
-                
-                if isbn_key in data:
-                    book_data = data[isbn_key]
-                    
-                    # Extract information
-                    title = book_data.get('title', '')
-                    authors = [author.get('name', '') for author in book_data.get('authors', [])]
-                    author = ', '.join(authors) if authors else ''
-                    
-                    # Get cover image
-                    cover_url = ''
-                    if 'cover' in book_data and 'large' in book_data['cover']:
-                        cover_url = book_data['cover']['large']
-                    elif 'cover' in book_data and 'medium' in book_data['cover']:
-                        cover_url = book_data['cover']['medium']
-                    
-                    # Get page count
-                    pages = book_data.get('number_of_pages', 0)
-                    
-                    # Get subjects as genres
-                    subjects = book_data.get('subjects', [])
-                    genres = [subject.get('name', '') for subject in subjects[:5]]  # Limit to 5 genres
-                    
-                    return {
-                        'title': title,
-                        'author': author,
-                        'isbn': isbn,
-                        'pages': pages,
-                        'cover_url': cover_url,
-                        'genres': genres if genres else ['Unknown']
-                    }
-            
-            # Fallback to Google Books API
-            return BookAPI.lookup_google_books(isbn)
-            
+            isbn = clean_isbn(isbn)
+            return BookAPI.cached_lookup(ResponseCache.isbn_key('lookup', isbn), lambda: BookAPI.fetch_isbn(isbn))
+        
         except Exception as e:
             print(f"Error looking up ISBN {isbn}: {e}")
             return None
-    
+
+    @staticmethod
+    def fetch_isbn(isbn: str) -> Optional[Dict]:
+        # Try Open Library API
+        url = OPEN_LIBRARY_URL + open_library_path([isbn])
+        open_library_error = None
+        try:
+            response = http_get('openlibrary', url)
+            if response.status_code == 200:
+                book_data = response.json().get(f"ISBN:{isbn}")
+                if book_data:
+                    return parse_open_library(isbn, book_data)
+        except (TransientError, CircuitOpenError) as e:
+            open_library_error = e
+        
+        # Fallback to Google Books API
+        result = BookAPI.cached_lookup(ResponseCache.isbn_key('google', isbn),
+                                       lambda: BookAPI.fetch_google_books(isbn))
+        if result is None and open_library_error:
+            # Open Library might have it once it recovers, so don't remember "not found"
+            raise open_library_error
+        return result
+
     @staticmethod
     def lookup_google_books(isbn: str) -> Optional[Dict]:
         """
         Fallback to Google Books API
         """
         try:
-            url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('totalItems', 0) > 0:
-                    book = data['items'][0]['volumeInfo']
-                    
-                    title = book.get('title', '')
-                    authors = book.get('authors', [])
-                    author = ', '.join(authors) if authors else ''
-                    
-                    # Get cover image
-                    cover_url = ''
-                    if 'imageLinks' in book:
-                        cover_url = book['imageLinks'].get('large', 
-                                   book['imageLinks'].get('medium', 
-                                   book['imageLinks'].get('thumbnail', '')))
-                    
-                    pages = book.get('pageCount', 0)
-                    genres = book.get('categories', ['Unknown'])
-                    
-                    return {
-                        'title': title,
-                        'author': author,
-                        'isbn': isbn,
-                        'pages': pages,
-                        'cover_url': cover_url,
-                        'genres': genres
-                    }
-            
+            isbn = clean_isbn(isbn)
+            return BookAPI.cached_lookup(ResponseCache.isbn_key('google', isbn),
+                                         lambda: BookAPI.fetch_google_books(isbn))
+        
         except Exception as e:
             print(f"Error with Google Books API for ISBN {isbn}: {e}")
-            
+        
+        return None
+
+    @staticmethod
+    def fetch_google_books(isbn: str) -> Optional[Dict]:
+        url = GOOGLE_BOOKS_URL + google_books_path(isbn)
+        response = http_get('googlebooks', url)
+        
+        if response.status_code == 200:
+            return parse_google_books(isbn, response.json())
         return None
 
     @staticmethod
@@ -107,37 +111,42 @@ class BookAPI:
         Search for books by title/author
         """
         try:
-            # Use Google Books API for search
-            url = f"https://www.googleapis.com/books/v1/volumes?q={query}&maxResults={max_results}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-                
-                for item in data.get('items', []):
-                    book = item['volumeInfo']
-                    
-                    # Get ISBN
-                    isbn = ''
-                    for identifier in book.get('industryIdentifiers', []):
-                        if identifier.get('type') in ['ISBN_13', 'ISBN_10']:
-                            isbn = identifier.get('identifier', '')
-                            break
-                    
-                    result = {
-                        'title': book.get('title', ''),
-                        'author': ', '.join(book.get('authors', [])),
-                        'isbn': isbn,
-                        'pages': book.get('pageCount', 0),
-                        'cover_url': book.get('imageLinks', {}).get('thumbnail', ''),
-                        'genres': book.get('categories', ['Unknown'])
-                    }
-                    results.append(result)
-                
-                return results
-                
+            key = ResponseCache.query_key('google', query, max_results)
+            return BookAPI.cached_lookup(key, lambda: BookAPI.fetch_search(query, max_results), default=[])
+        
         except Exception as e:
             print(f"Error searching books: {e}")
+        
+        return []
+
+    @staticmethod
+    def fetch_search(query: str, max_results: int) -> List[Dict]:
+        # Use Google Books API for search
+        url = f"https://www.googleapis.com/books/v1/volumes?q={query}&maxResults={max_results}"
+        response = http_get('googlebooks', url)
+        
+        results = []
+        if response.status_code == 200:
+            data = response.json()
             
-        return []
\ No newline at end of file
+            for item in data.get('items', []):
+                book = item['volumeInfo']
+                
+                # Get ISBN
+                isbn = ''
+                for identifier in book.get('industryIdentifiers', []):
+                    if identifier.get('type') in ['ISBN_13', 'ISBN_10']:
+                        isbn = identifier.get('identifier', '')
+                        break
+                
+                result = {
+                    'title': book.get('title', ''),
+                    'author': ', '.join(book.get('authors', [])),
+                    'isbn': isbn,
+                    'pages': book.get('pageCount', 0),
+                    'cover_url': book.get('imageLinks', {}).get('thumbnail', ''),
+                    'genres': book.get('categories', ['Unknown'])
+                }
+                results.append(result)
+        
+        return results
@@ -0,0 +1,76 @@
+from urllib.parse import quote
+from typing import Dict, Optional, Iterable
+
+OPEN_LIBRARY_URL = "https://openlibrary.org"
+GOOGLE_BOOKS_URL = "https://www.googleapis.com"
+
+def clean_isbn(isbn: str) -> str:
+    return isbn.replace('-', '').replace(' ', '')
+
+def open_library_path(isbns: Iterable[str]) -> str:
+    """Open Library books API path for one or more (already cleaned) ISBNs"""
+    bibkeys = ','.join(f"ISBN:{isbn}" for isbn in isbns)
+    return f"/api/books?bibkeys={bibkeys}&jscmd=data&format=json"
+
+def google_books_path(isbn: str) -> str:
+    return f"/books/v1/volumes?q=isbn:{quote(isbn)}"
+
+def parse_open_library(isbn: str, book_data: Dict) -> Dict:
+    """Turn one Open Library `jscmd=data` record into our lookup result"""
+    # Extract information
+    title = book_data.get('title', '')
+    authors = [author.get('name', '') for author in book_data.get('authors', [])]
+    author = ', '.join(authors) if authors else ''
+
+    # Get cover image
+    cover_url = ''
+    if 'cover' in book_data and 'large' in book_data['cover']:
+        cover_url = book_data['cover']['large']
+    elif 'cover' in book_data and 'medium' in book_data['cover']:
+        cover_url = book_data['cover']['medium']
+
+    # Get page count
+    pages = book_data.get('number_of_pages', 0)
+
+    # Get subjects as genres
+    subjects = book_data.get('subjects', [])
+    genres = [subject.get('name', '') for subject in subjects[:5]]  # Limit to 5 genres
+
+    return {
+        'title': title,
+        'author': author,
+        'isbn': isbn,
+        'pages': pages,
+        'cover_url': cover_url,
+        'genres': genres if genres else ['Unknown']
+    }
+
+def parse_google_books(isbn: str, data: Dict) -> Optional[Dict]:
+    """Turn a Google Books volumes response into our lookup result (first match only)"""
+    if data.get('totalItems', 0) <= 0 or not data.get('items'):
+        return None
+
+    book = data['items'][0]['volumeInfo']
+
+    title = book.get('title', '')
+    authors = book.get('authors', [])
+    author = ', '.join(authors) if authors else ''
+
+    # Get cover image
+    cover_url = ''
+    if 'imageLinks' in book:
+        cover_url = book['imageLinks'].get('large',
+                   book['imageLinks'].get('medium',
+                   book['imageLinks'].get('thumbnail', '')))
+
+    pages = book.get('pageCount', 0)
+    genres = book.get('categories', ['Unknown'])
+
+    return {
+        'title': title,
+        'author': author,
+        'isbn': isbn,
+        'pages': pages,
+        'cover_url': cover_url,
+        'genres': genres
+    }
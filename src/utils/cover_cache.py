@@ -0,0 +1,206 @@
+import os
+import io
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+from .atomic_write import atomic_write
+from .resilience import PROVIDERS, TransientError
+from .instrumentation import timer
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it the original cover stands in for thumbnails
+    Image = None
+
+# Fixed thumbnail bounding boxes (width, height)
+THUMBNAIL_SIZES = {'small': (64, 96), 'medium': (128, 192)}
+
+IMAGE_TYPES = {b'\xff\xd8\xff': '.jpg', b'\x89PNG': '.png', b'GIF8': '.gif', b'RIFF': '.webp'}
+
+def image_extension(data: bytes) -> Optional[str]:
+    for magic, extension in IMAGE_TYPES.items():
+        if data.startswith(magic):
+            return extension
+    return None
+
+class CoverCache:
+    """Content-addressed on-disk cover store with fixed-size thumbnails.
+
+    Each cover URL is downloaded once; the image is stored under the SHA-256
+    of its bytes (so the same cover behind two URLs is kept once) and a small
+    pointer file maps the URL to it. Thumbnails are generated per size next to
+    the originals, and the most recently used ones are kept in memory.
+    """
+
+    def __init__(self, cache_dir: str, memory_items: int = 256, workers: int = 4, timeout: float = 10):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.memory_items = memory_items
+        self.memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.ready: Dict[str, str] = {}
+        # URLs known not to be on disk yet, so renders don't stat their pointer files again
+        self.absent = set()
+        self.failed = set()
+        self.in_flight = set()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="covers")
+        self.downloads = 0
+        for sub in ('originals', 'thumbnails', 'urls'):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def original_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, 'originals', name[:2], name)
+
+    def thumbnail_path_for(self, name: str, size: str) -> str:
+        digest = os.path.splitext(name)[0]
+        extension = '.jpg' if Image is not None else os.path.splitext(name)[1]
+        return os.path.join(self.cache_dir, 'thumbnails', size, digest[:2], digest + extension)
+
+    def stored_name(self, url: str) -> Optional[str]:
+        """Content file name a URL resolved to, if it was downloaded before"""
+        name = self.ready.get(url)
+        if name:
+            return name
+        if url in self.absent:
+            return None
+        pointer = os.path.join(self.cache_dir, 'urls', self.url_key(url))
+        try:
+            with open(pointer, 'r', encoding='utf-8') as file:
+                name = file.read().strip()
+        except OSError:
+            name = None
+        with self.lock:
+            if name and os.path.exists(self.original_path(name)):
+                self.ready[url] = name
+                return name
+            self.absent.add(url)
+        return None
+
+    def is_ready(self, url: str) -> bool:
+        return bool(url) and self.stored_name(url) is not None
+
+    def download(self, url: str) -> Optional[str]:
+        """Fetch a cover (once) and store it by content hash; returns its file name"""
+        name = self.stored_name(url)
+        if name:
+            return name
+
+        # Imported here so the HTTP stack isn't loaded at startup when every cover is cached
+        import urllib.error
+        import urllib.request
+
+        def request():
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    return response.read()
+            except urllib.error.HTTPError as e:
+                if e.code == 429 or e.code >= 500:
+                    raise TransientError(f"HTTP {e.code} from {url}") from e
+                raise
+            except OSError as e:
+                raise TransientError(str(e)) from e
+
+        with timer("covers.download"):
+            data = PROVIDERS['covers'].call(request)
+        extension = image_extension(data)
+        if not extension:
+            raise ValueError(f"{url} did not return an image")
+        name = hashlib.sha256(data).hexdigest() + extension
+        path = self.original_path(name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_write(path, 'wb', fsync=False) as file:
+                file.write(data)
+        with atomic_write(os.path.join(self.cache_dir, 'urls', self.url_key(url)), fsync=False) as file:
+            file.write(name)
+        with self.lock:
+            self.ready[url] = name
+            self.absent.discard(url)
+            self.downloads += 1
+        for size in THUMBNAIL_SIZES:
+            self.make_thumbnail(name, size)
+        return name
+
+    def make_thumbnail(self, name: str, size: str) -> str:
+        path = self.thumbnail_path_for(name, size)
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if Image is None:
+            with open(self.original_path(name), 'rb') as source, atomic_write(path, 'wb', fsync=False) as file:
+                file.write(source.read())
+            return path
+        with Image.open(self.original_path(name)) as image:
+            image.thumbnail(THUMBNAIL_SIZES[size])
+            buffer = io.BytesIO()
+            image.convert('RGB').save(buffer, 'JPEG', quality=85)
+        with atomic_write(path, 'wb', fsync=False) as file:
+            file.write(buffer.getvalue())
+        return path
+
+    def thumbnail_path(self, url: str, size: str = 'small') -> Optional[str]:
+        """Local thumbnail file for a cover, or None if it hasn't been downloaded yet (never blocks on the network)"""
+        name = self.stored_name(url) if url else None
+        if not name:
+            return None
+        try:
+            return self.make_thumbnail(name, size)
+        except Exception as e:
+            print(f"⚠️ Error creating cover thumbnail: {e}")
+            return None
+
+    def thumbnail_base64(self, url: str, size: str = 'small') -> Optional[str]:
+        """Thumbnail bytes, base64-encoded for the UI, from the in-memory LRU when possible"""
+        key = (url, size)
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached is not None:
+                self.memory.move_to_end(key)
+                return cached
+        path = self.thumbnail_path(url, size)
+        if not path:
+            return None
+        with open(path, 'rb') as file:
+            encoded = base64.b64encode(file.read()).decode('ascii')
+        with self.lock:
+            self.memory[key] = encoded
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return encoded
+
+    def prefetch(self, urls: Iterable[str], on_complete: Optional[Callable[[], None]] = None):
+        """Download missing covers in the background; on_complete runs once if any arrived"""
+        candidates = [url for url in dict.fromkeys(urls) if url and not self.stored_name(url)]
+        with self.lock:
+            missing = [url for url in candidates if url not in self.failed and url not in self.in_flight]
+            self.in_flight.update(missing)
+        if not missing:
+            return
+
+        remaining = [len(missing)]
+        arrived = [0]
+
+        def finished(url, future):
+            with self.lock:
+                self.in_flight.discard(url)
+                if future.exception() is None:
+                    arrived[0] += 1
+                else:
+                    # Don't retry a broken cover URL on every scroll
+                    self.failed.add(url)
+                    print(f"⚠️ Could not fetch cover {url}: {future.exception()}")
+                remaining[0] -= 1
+                done = remaining[0] == 0 and arrived[0] > 0
+            if done and on_complete:
+                on_complete()
+
+        for url in missing:
+            future = self.executor.submit(self.download, url)
+            future.add_done_callback(lambda future, url=url: finished(url, future))
@@ -1,37 +1,50 @@
 import csv
+import gzip
 import json
 from datetime import datetime
-from typing import List
+from typing import Iterable, Iterator, List
 import os
 
-def export_to_csv(books: List, filename: str) -> bool:
-    """Export books to CSV file"""
+CSV_FIELDNAMES = [
+    'Title', 'Author', 'Genres', 'Status', 'Rating', 'Review',
+    'Total Pages', 'Pages Read', 'Progress %', 'Date Started', 
+    'Date Finished', 'Reading Time (hours)', 'ISBN'
+]
+
+def open_export(filename: str, compress: bool = None, newline: str = None):
+    """Open an export file for text writing, gzip-compressed if asked to or if the name ends in .gz"""
+    if compress is None:
+        compress = filename.endswith('.gz')
+    if compress:
+        return gzip.open(filename, 'wt', encoding='utf-8', newline=newline, compresslevel=6)
+    return open(filename, 'w', encoding='utf-8', newline=newline)
+
+def csv_rows(books: Iterable) -> Iterator[list]:
+    """One CSV row per book, produced lazily"""
+    for book in books:
+        yield [
+            book.title,
+            book.author,
+            ' • '.join(book.genre),
+            book.status,
+            '★' * book.rating if book.rating > 0 else 'Not rated',
+            book.review,
+            book.total_pages,
+            book.pages_read,
+            f"{book.get_progress_percentage():.1f}%",
+            book.date_started,
+            book.date_finished,
+            f"{book.get_reading_time_hours():.1f}",
+            book.isbn,
+        ]
+
+def export_to_csv(books: List, filename: str, compress: bool = None) -> bool:
+    """Export books to CSV file, streaming rows straight to disk"""
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as file:
-            fieldnames = [
-                'Title', 'Author', 'Genres', 'Status', 'Rating', 'Review',
-                'Total Pages', 'Pages Read', 'Progress %', 'Date Started', 
-                'Date Finished', 'Reading Time (hours)', 'ISBN'
-            ]
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for book in books:
-                writer.writerow({
-                    'Title': book.title,
-                    'Author': book.author,
-                    'Genres': ' • '.join(book.genre),
-                    'Status': book.status,
-                    'Rating': '★' * book.rating if book.rating > 0 else 'Not rated',
-                    'Review': book.review,
-                    'Total Pages': book.total_pages,
-                    'Pages Read': book.pages_read,
-                    'Progress %': f"{book.get_progress_percentage():.1f}%",
-                    'Date Started': book.date_started,
-                    'Date Finished': book.date_finished,
-                    'Reading Time (hours)': f"{book.get_reading_time_hours():.1f}",
-                    'ISBN': book.isbn
-                })
+        with open_export(filename, compress, newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDNAMES)
+            writer.writerows(csv_rows(books))
         return True
     except Exception as e:
         print(f"Error exporting to CSV: {e}")
@@ -73,14 +86,12 @@ def export_reading_report(library, filename: str) -> bool:
                 file.write(f"{genre}: {count} books\n")
             file.write("\n")
             
-            # Recent Finishes
-            finished_books = [b for b in library.books if b.status == "Finished" and b.date_finished]
+            # Recent Finishes (most recent first)
+            finished_books = library.get_recent_finishes(10)
             if finished_books:
                 file.write("🏆 RECENT FINISHES\n")
                 file.write("-" * 20 + "\n")
-                # Sort by date finished (most recent first)
-                finished_books.sort(key=lambda x: x.date_finished, reverse=True)
-                for book in finished_books[:10]:
+                for book in finished_books:
                     rating_stars = "★" * book.rating if book.rating > 0 else "Not rated"
                     file.write(f"{book.title} by {book.author} - {rating_stars} ({book.date_finished})\n")
                 file.write("\n")
@@ -105,47 +116,74 @@ def export_reading_report(library, filename: str) -> bool:
         print(f"Error generating reading report: {e}")
         return False
 
-def export_to_json(library, filename: str) -> bool:
-    """Export library data to JSON"""
+def iter_json(library, books: Iterable, compact: bool = False) -> Iterator[str]:
+    """The library export document as text chunks, one book at a time.
+
+    Produces the same document json.dump(..., indent=2) would, or a compact one
+    without whitespace, without ever holding all the books' dicts at once.
+    """
+    header = {
+        'library_name': library.name,
+        'export_date': datetime.now().isoformat(),
+        'statistics': library.get_reading_statistics(),
+    }
+    if compact:
+        yield json.dumps(header, ensure_ascii=False, separators=(',', ':'))[:-1] + ',"books":['
+        separator = ''
+        for book in books:
+            yield separator + json.dumps(book.to_dict(), ensure_ascii=False, separators=(',', ':'))
+            separator = ','
+        yield ']}'
+        return
+
+    yield json.dumps(header, indent=2, ensure_ascii=False)[:-2] + ',\n  "books": ['
+    separator = '\n    '
+    empty = True
+    for book in books:
+        yield separator + json.dumps(book.to_dict(), indent=2, ensure_ascii=False).replace('\n', '\n    ')
+        separator = ',\n    '
+        empty = False
+    yield ']\n}' if empty else '\n  ]\n}'
+
+def export_to_json(library, filename: str, compact: bool = False, compress: bool = None) -> bool:
+    """Export library data to JSON, streaming books to disk (optionally compact and/or gzipped)"""
     try:
-        data = {
-            'library_name': library.name,
-            'export_date': datetime.now().isoformat(),
-            'statistics': library.get_reading_statistics(),
-            'books': [book.to_dict() for book in library.books]
-        }
-        
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
+        # A shallow copy so edits during the export can't change the list mid-iteration
+        books = list(library.books)
+        with open_export(filename, compress) as file:
+            for chunk in iter_json(library, books, compact):
+                file.write(chunk)
         return True
     except Exception as e:
         print(f"Error exporting to JSON: {e}")
         return False
 
+def export_to_ndjson(books: Iterable, filename: str, compress: bool = None) -> bool:
+    """Export books as newline-delimited JSON, one compact object per line"""
+    try:
+        with open_export(filename, compress) as file:
+            file.writelines(json.dumps(book.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n'
+                            for book in books)
+        return True
+    except Exception as e:
+        print(f"Error exporting to NDJSON: {e}")
+        return False
+
 def import_from_csv(filename: str) -> List[dict]:
     """Import books from CSV file"""
+    # Parsing and validation are shared with Library loading and CsvImporter
+    from models.importer import read_csv_books
     books = []
+    errors = []
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Map CSV columns to book attributes
-                book_data = {
-                    'title': row.get('Title', ''),
-                    'author': row.get('Author', ''),
-                    'genre': row.get('Genres', '').split(' • ') if row.get('Genres') else ['Unknown'],
-                    'status': row.get('Status', 'To Be Read'),
-                    'rating': 0,  # Will need to parse stars
-                    'review': row.get('Review', ''),
-                    'total_pages': int(row.get('Total Pages', 0)),
-                    'pages_read': int(row.get('Pages Read', 0)),
-                    'date_started': row.get('Date Started', ''),
-                    'date_finished': row.get('Date Finished', ''),
-                    'reading_time_minutes': int(float(row.get('Reading Time (hours)', 0)) * 60),
-                    'isbn': row.get('ISBN', '')
-                }
-                books.append(book_data)
+        for book in read_csv_books(filename, errors):
+            book_data = book.to_dict()
+            book_data['genre'] = book.genre
+            del book_data['cover_url']
+            books.append(book_data)
     except Exception as e:
         print(f"Error importing from CSV: {e}")
+    for line, message in errors:
+        print(f"Skipping line {line} of {filename}: {message}")
     
-    return books
\ No newline at end of file
+    return books
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from .atomic_write import atomic_write
+
+# Upper bounds (ms) of the histogram buckets; the last bucket takes everything slower
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+BUCKET_LABELS = [f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+
+class Histogram:
+    """Call count, total, min/max and bucketed durations of one operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls (capped at the max seen)"""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'min_ms': round(self.min_ms or 0.0, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': round(self.percentile(0.5), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'buckets': {label: count for label, count in zip(BUCKET_LABELS, self.buckets) if count},
+        }
+
+class Timer:
+    """Context manager that records its block's duration under `name`"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: "Instrumentation", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class NullTimer:
+    """Stands in for Timer while instrumentation is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = NullTimer()
+
+class Instrumentation:
+    """Opt-in timers, counters and a slow-operation log for the app's hot paths.
+
+    While disabled, instrumented calls cost one attribute check. Enabled, every
+    timed call lands in a per-operation histogram, and calls slower than
+    `slow_threshold_ms` are printed and kept in a short log.
+    """
+
+    def __init__(self, enabled: bool = False, slow_threshold_ms: float = 250, slow_log_size: int = 100):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.lock = threading.Lock()
+        self.timers: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.started = time.time()
+
+    def record(self, name: str, seconds: float):
+        ms = seconds * 1000
+        with self.lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram()
+            histogram.add(ms)
+            slow = ms >= self.slow_threshold_ms
+            if slow:
+                self.slow_log.append({'operation': name, 'ms': round(ms, 1),
+                                      'at': datetime.now().isoformat(timespec='seconds')})
+        if slow:
+            print(f"⚠️ Slow operation {name}: {ms:.0f} ms")
+
+    def count(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name: str):
+        return Timer(self, name) if self.enabled else NULL_TIMER
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a function (under its qualified name by default)"""
+        def decorate(function):
+            label = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.slow_log.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict:
+        """Everything recorded so far; timers are ordered by total time spent"""
+        with self.lock:
+            timers = sorted(self.timers.items(), key=lambda item: item[1].total_ms, reverse=True)
+            return {
+                'enabled': self.enabled,
+                'since': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'slow_threshold_ms': self.slow_threshold_ms,
+                'timers': {name: histogram.summary() for name, histogram in timers},
+                'counters': dict(sorted(self.counters.items())),
+                'slow_operations': list(self.slow_log),
+            }
+
+    def dump(self, filename: str, extra: Optional[Dict] = None) -> bool:
+        """Write the snapshot (plus any extra sections) to a JSON file"""
+        report = self.snapshot()
+        if extra:
+            report.update(extra)
+        try:
+            with atomic_write(filename, fsync=False) as file:
+                json.dump(report, file, indent=2, ensure_ascii=False, default=str)
+            return True
+        except Exception as e:
+            print(f"⚠️ Error writing diagnostics: {e}")
+            return False
+
+# Shared by the models, the API clients and the UI; READWISE_INSTRUMENT=1 turns it on at startup
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get("READWISE_INSTRUMENT") == "1")
+
+def timed(name: Optional[str] = None) -> Callable:
+    return INSTRUMENTATION.timed(name)
+
+def timer(name: str):
+    return INSTRUMENTATION.timer(name)
+
+def count(name: str, amount: int = 1):
+    INSTRUMENTATION.count(name, amount)
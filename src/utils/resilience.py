@@ -0,0 +1,183 @@
+import time
+import random
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+class TransientError(Exception):
+    """A failure worth retrying: network errors, HTTP 429 and 5xx"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open"""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (HTTP dates are ignored)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and fails fast for `reset_timeout`
+    seconds; then a single trial call decides whether it closes again."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_neutral(self):
+        """A call that says nothing about the provider's health: free the trial slot, change nothing else"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this opened the circuit"""
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+class Provider:
+    """Rate limit, retry and circuit breaker around the calls to one upstream API"""
+
+    def __init__(self, name: str, rate: float = 5.0, burst: float = 10.0, max_attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 8.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.metrics = {'calls': 0, 'successes': 0, 'failures': 0, 'retries': 0,
+                        'short_circuits': 0, 'circuit_opens': 0, 'throttle_wait_seconds': 0.0}
+
+    def _count(self, metric: str, amount=1):
+        with self.lock:
+            self.metrics[metric] += amount
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After when it sent one"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, request: Callable[[], T]) -> T:
+        """Run `request`, retrying TransientError; raises CircuitOpenError while the provider is down"""
+        self._count('calls')
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self._count('short_circuits')
+                raise CircuitOpenError(f"{self.name} is unavailable, not calling it for now")
+            waited = self.bucket.acquire()
+            if waited:
+                self._count('throttle_wait_seconds', waited)
+            try:
+                result = request()
+            except TransientError as e:
+                self._count('failures')
+                if self.breaker.record_failure():
+                    self._count('circuit_opens')
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                self._count('retries')
+                time.sleep(self.backoff(attempt, e.retry_after))
+                continue
+            except Exception:
+                # Not the provider's fault (bad data, bugs), but no proof it has recovered either;
+                # a half-open circuit stays half-open and lets the next call be the trial
+                self.breaker.record_neutral()
+                raise
+            self.breaker.record_success()
+            self._count('successes')
+            return result
+
+    def stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.metrics)
+        stats['circuit'] = self.breaker.state
+        return stats
+
+# Shared by BookAPI and AsyncBookAPI so both respect the same limits
+PROVIDERS = {
+    'openlibrary': Provider('Open Library', rate=5.0, burst=10.0),
+    'googlebooks': Provider('Google Books', rate=10.0, burst=20.0),
+    'covers': Provider('Cover images', rate=10.0, burst=20.0),
+}
+
+def provider_stats() -> Dict[str, Dict]:
+    return {key: provider.stats() for key, provider in PROVIDERS.items()}
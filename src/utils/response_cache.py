@@ -0,0 +1,117 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+DAY = 24 * 60 * 60
+
+class ResponseCache:
+    """SQLite-backed cache of book lookup results, shared by BookAPI and AsyncBookAPI.
+
+    Found results live for `ttl` seconds and "not found" results (stored as None)
+    for the shorter `negative_ttl`, so bad ISBNs aren't retried on every lookup
+    but do get another chance later. The least recently used entries beyond
+    `max_entries` are evicted. In offline mode lookups are served from the
+    cache only, expired entries included.
+    """
+
+    def __init__(self, db_file: str, ttl: float = 30 * DAY, negative_ttl: float = DAY,
+                 max_entries: int = 5000, offline: bool = False):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+        """)
+
+    @staticmethod
+    def isbn_key(source: str, isbn: str) -> str:
+        return f"{source}:isbn:{isbn}"
+
+    @staticmethod
+    def query_key(source: str, query: str, *params) -> str:
+        normalized = ' '.join(query.lower().split())
+        return ':'.join([source, 'query', normalized] + [str(param) for param in params])
+
+    def get(self, key: str) -> Tuple[bool, Optional[Any]]:
+        """(found, value) for a key; value is None for a cached "not found" """
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            value, expires_at = row
+            if expires_at < now and not self.offline:
+                self.expired += 1
+                self.misses += 1
+                return False, None
+            self.connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            if value is None:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+            return True, json.loads(value)
+
+    def put(self, key: str, value: Optional[Any]):
+        """Cache a result; None (or an empty list) is cached as "not found" with the negative TTL"""
+        now = time.time()
+        negative = value is None or value == []
+        expires_at = now + (self.negative_ttl if negative else self.ttl)
+        stored = None if value is None else json.dumps(value, ensure_ascii=False)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, stored, expires_at, now))
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,))
+            self.evictions += excess
+
+    def purge_expired(self) -> int:
+        with self.lock:
+            cursor = self.connection.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self.connection.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            (entries,) = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+            return {'entries': entries, 'hits': self.hits, 'negative_hits': self.negative_hits,
+                    'misses': self.misses, 'expired': self.expired, 'evictions': self.evictions}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
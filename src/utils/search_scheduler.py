@@ -0,0 +1,58 @@
+import threading
+from typing import Callable, Optional
+
+class SearchToken:
+    """Handed to each search run; becomes cancelled as soon as a newer query is submitted"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class SearchScheduler:
+    """Debounces search input and cancels superseded searches.
+
+    `run(query, token)` is called on a worker thread once typing pauses for
+    `delay` seconds. Runs never overlap, and a run should check
+    `token.cancelled` between stages and stop early when it is set.
+    """
+
+    def __init__(self, run: Callable[[str, SearchToken], None], delay: float = 0.15):
+        self.run = run
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.run_lock = threading.Lock()
+        self.timer: Optional[threading.Timer] = None
+        self.token: Optional[SearchToken] = None
+
+    def submit(self, query: str, delay: float = None):
+        """Schedule a search for `query`, superseding any pending or running one"""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            if self.token:
+                self.token.cancel()
+            token = SearchToken(query)
+            self.token = token
+            self.timer = threading.Timer(self.delay if delay is None else delay, self._execute, (token,))
+            self.timer.daemon = True
+            self.timer.start()
+
+    def cancel(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            if self.token:
+                self.token.cancel()
+
+    def _execute(self, token: SearchToken):
+        # Wait for an older run to notice its cancellation and finish
+        with self.run_lock:
+            if token.cancelled:
+                return
+            try:
+                self.run(token.query, token)
+            except Exception as e:
+                print(f"Error running search: {e}")